@@ -7,13 +7,161 @@ Responsibilities:
 - Enforces strict output constraints
 - Normalizes and validates LLM output
 - Signals when a safe fallback is applied
+- Caches successful classifications (LRU/TTL, optional SQLite tier)
+- Coalesces identical in-flight LLM classifications into one call
+- Tries the local fast path first and escalates only when unsure
+- Classifies many messages per LLM call for bulk backfills
+- Escalates to a larger model (when the LLM offers one) if the
+  output fails validation
 
 This agent performs classification ONLY.
 All routing decisions are handled by the controller.
 """
 
+import hashlib
+import json
+import os
 import re
-from utils.prompt_templates import CLASSIFIER_PROMPT
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from agents.fast_classifier import fast_classify, predict as local_predict
+from database.store import run_in_db_executor
+from utils.cache import SingleFlight, SQLiteCache, TTLCache
+from utils.prompt_templates import BATCH_CLASSIFIER_PROMPT, CLASSIFIER_PROMPT
+from utils.text import normalize_message
+
+
+# ------------------------------------------------------------------
+# CLASSIFICATION CACHE
+# ------------------------------------------------------------------
+
+# Classification runs at temperature 0, so a (message, model, prompt)
+# triple always maps to the same label and can be served from cache.
+_PROMPT_VERSION = hashlib.sha256(CLASSIFIER_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+_label_cache = TTLCache(
+    maxsize=int(os.getenv("CLASSIFIER_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("CLASSIFIER_CACHE_TTL", "86400"))
+)
+
+# Persistent tier is opt-in: set CLASSIFIER_CACHE_DB to a file path
+_persistent_cache: Optional[SQLiteCache] = (
+    SQLiteCache(
+        os.environ["CLASSIFIER_CACHE_DB"],
+        ttl=float(os.getenv("CLASSIFIER_CACHE_TTL", "86400"))
+    )
+    if os.getenv("CLASSIFIER_CACHE_DB") else None
+)
+
+
+# Returned when the LLM call failed and no local tier recognised the
+# message; the controller asks the customer to retry instead of guessing
+UNAVAILABLE_LABEL = "unavailable"
+
+
+# Concurrent misses for the same key (e.g. many customers reporting the
+# same outage at once) share a single upstream call
+_in_flight = SingleFlight()
+
+
+def _cache_key(message: str, llm) -> str:
+    model = getattr(llm, "model", type(llm).__name__)
+    raw = f"{_PROMPT_VERSION}|{model}|{normalize_message(message)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    label = _label_cache.get(key)
+    if label is not None:
+        return label
+
+    if _persistent_cache is not None:
+        label = _persistent_cache.get(key)
+        if label is not None:
+            # Promote to the in-memory tier
+            _label_cache.set(key, label)
+            return label
+
+    return None
+
+
+def _cache_set(key: str, label: str) -> None:
+    _label_cache.set(key, label)
+    if _persistent_cache is not None:
+        _persistent_cache.set(key, label)
+
+
+async def _acache_get(key: str) -> Optional[str]:
+    # Memory tier inline; the SQLite tier blocks, so it runs on the DB
+    # executor instead of the event loop
+    label = _label_cache.get(key)
+    if label is not None or _persistent_cache is None:
+        return label
+
+    return await run_in_db_executor(_cache_get, key)
+
+
+async def _acache_set(key: str, label: str) -> None:
+    _label_cache.set(key, label)
+    if _persistent_cache is not None:
+        await run_in_db_executor(_persistent_cache.set, key, label)
+
+
+def classifier_cache_stats() -> dict:
+    """
+    Returns hit/miss counters for the in-memory and persistent tiers.
+    """
+
+    return {
+        "memory": _label_cache.stats(),
+        "persistent": _persistent_cache.stats() if _persistent_cache else None,
+        "coalescing": _in_flight.stats(),
+    }
+
+
+def clear_classifier_cache() -> None:
+    _label_cache.clear()
+    if _persistent_cache is not None:
+        _persistent_cache.clear()
+
+
+# ------------------------------------------------------------------
+# TIERED CLASSIFIER (local fast path → LLM)
+# ------------------------------------------------------------------
+
+# Which tier produced a label; logged so the local model is only ever
+# trained on the LLM's decisions, never on its own
+SOURCE_FAST = "fast"
+SOURCE_LLM = "llm"
+
+
+def classify_message(message: str, llm) -> tuple[str, bool, str]:
+    """
+    Classifies a message locally when the fast path is confident and
+    escalates to classify_message_llm() otherwise.
+
+    Returns (label, fallback_used, source): the first two as in
+    classify_message_llm(), source is SOURCE_FAST or SOURCE_LLM.
+    """
+
+    label = fast_classify(message)
+    if label is not None:
+        return label, False, SOURCE_FAST
+
+    return (*classify_message_llm(message, llm), SOURCE_LLM)
+
+
+async def aclassify_message(message: str, llm) -> tuple[str, bool, str]:
+    """
+    Async variant of classify_message().
+    """
+
+    label = fast_classify(message)
+    if label is not None:
+        return label, False, SOURCE_FAST
+
+    return (*await aclassify_message_llm(message, llm), SOURCE_LLM)
 
 
 # ------------------------------------------------------------------
@@ -33,18 +181,100 @@ def classify_message_llm(message: str, llm) -> tuple[str, bool]:
         - query
 
     fallback_used : bool
-        True if the system fell back to 'query' due to
-        invalid, ambiguous, or failed LLM output.
+        True if the LLM output was not used: the label is 'query' for
+        invalid or ambiguous output. When the LLM call itself failed
+        (e.g. circuit open) it is the local classifier's best guess, or
+        UNAVAILABLE_LABEL if the local tiers had none.
     """
 
+    key = _cache_key(message, llm)
+    cached_label = _cache_get(key)
+    if cached_label is not None:
+        return cached_label, False
+
+    return _in_flight.do(key, lambda: _classify_uncached(key, message, llm))
+
+
+def _classify_uncached(key: str, message: str, llm) -> tuple[str, bool]:
     prompt = CLASSIFIER_PROMPT.format(message=message)
 
     try:
         raw_response = llm.invoke(prompt)
     except Exception:
-        # LLM invocation failed → safe fallback
-        return "query", True
+        # LLM unavailable → local classifier's best guess, if any
+        return _local_fallback(message), True
+
+    label, fallback_used = _validate_response(raw_response)
+
+    # Invalid output from the cheap tier → one try on the larger model
+    if fallback_used and hasattr(llm, "escalate"):
+        try:
+            escalated = llm.escalate(prompt)
+        except Exception:
+            escalated = None
+        if escalated is not None:
+            label, fallback_used = _validate_response(escalated)
+
+    return _cache_result(key, label, fallback_used)
+
+
+async def aclassify_message_llm(message: str, llm) -> tuple[str, bool]:
+    """
+    Async variant of classify_message_llm().
 
+    Requires an LLM exposing `ainvoke(prompt)`. Same return contract.
+    """
+
+    key = _cache_key(message, llm)
+    cached_label = await _acache_get(key)
+    if cached_label is not None:
+        return cached_label, False
+
+    return await _in_flight.ado(key, lambda: _aclassify_uncached(key, message, llm))
+
+
+async def _aclassify_uncached(key: str, message: str, llm) -> tuple[str, bool]:
+    prompt = CLASSIFIER_PROMPT.format(message=message)
+
+    try:
+        raw_response = await llm.ainvoke(prompt)
+    except Exception:
+        # LLM unavailable → local classifier's best guess, if any
+        return _local_fallback(message), True
+
+    label, fallback_used = _validate_response(raw_response)
+
+    if fallback_used and hasattr(llm, "aescalate"):
+        try:
+            escalated = await llm.aescalate(prompt)
+        except Exception:
+            escalated = None
+        if escalated is not None:
+            label, fallback_used = _validate_response(escalated)
+
+    # Only cache genuine model decisions, never fallbacks
+    if not fallback_used:
+        await _acache_set(key, label)
+
+    return label, fallback_used
+
+
+def _local_fallback(message: str) -> str:
+    # No guess → no label: an outage must not turn every unrecognised
+    # message into a ticket
+    label, _, _ = local_predict(message)
+    return label or UNAVAILABLE_LABEL
+
+
+def _cache_result(key: str, label: str, fallback_used: bool) -> tuple[str, bool]:
+    # Only cache genuine model decisions, never fallbacks
+    if not fallback_used:
+        _cache_set(key, label)
+
+    return label, fallback_used
+
+
+def _validate_response(raw_response: str) -> tuple[str, bool]:
     # --------------------------------------------------------------
     # NORMALIZE LLM OUTPUT
     # --------------------------------------------------------------
@@ -59,6 +289,122 @@ def classify_message_llm(message: str, llm) -> tuple[str, bool]:
     return label, False
 
 
+# ------------------------------------------------------------------
+# BATCH CLASSIFIER
+# ------------------------------------------------------------------
+
+BATCH_SIZE = int(os.getenv("CLASSIFIER_BATCH_SIZE", "25"))
+BATCH_CONCURRENCY = int(os.getenv("CLASSIFIER_BATCH_CONCURRENCY", "8"))
+
+
+def classify_messages_llm(
+    messages: list[str],
+    llm,
+    batch_size: int = BATCH_SIZE,
+    max_concurrency: int = BATCH_CONCURRENCY,
+    max_retries: int = 2
+) -> list[tuple[str, bool]]:
+    """
+    Classifies many messages with one LLM call per batch.
+
+    Messages are numbered inside BATCH_CLASSIFIER_PROMPT and the model
+    answers with a JSON array of labels. Each label goes through
+    _normalize_label(); only the items that fail validation are re-sent,
+    up to `max_retries` more rounds. Up to `max_concurrency` batches are
+    in flight at once.
+
+    Returns one (label, fallback_used) tuple per input message, in
+    order, with the same meaning as classify_message_llm().
+    """
+
+    results: list = [None] * len(messages)
+
+    # Serve cached labels and collapse duplicate messages to one slot
+    pending: dict[str, list[int]] = {}
+    for index, message in enumerate(messages):
+        key = _cache_key(message, llm)
+        cached_label = _cache_get(key)
+        if cached_label is not None:
+            results[index] = (cached_label, False)
+        else:
+            pending.setdefault(key, []).append(index)
+
+    batch_size = max(batch_size, 1)
+
+    with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as executor:
+        for _ in range(max_retries + 1):
+            if not pending:
+                break
+
+            keys = list(pending)
+            batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+            outcomes = executor.map(
+                lambda batch: _classify_batch(
+                    [messages[pending[key][0]] for key in batch], llm
+                ),
+                batches
+            )
+
+            for batch, labels in zip(batches, outcomes):
+                for key, label in zip(batch, labels):
+                    if label is None:
+                        continue
+                    _cache_set(key, label)
+                    for index in pending.pop(key):
+                        results[index] = (label, False)
+
+    # Whatever still failed falls back exactly like the single-message path
+    for indices in pending.values():
+        for index in indices:
+            results[index] = ("query", True)
+
+    return results
+
+
+def _classify_batch(batch: list[str], llm) -> list[Optional[str]]:
+    numbered = "\n".join(
+        f"{position}. {json.dumps(message, ensure_ascii=False)}"
+        for position, message in enumerate(batch, start=1)
+    )
+    prompt = BATCH_CLASSIFIER_PROMPT.format(count=len(batch), messages=numbered)
+
+    try:
+        raw_response = llm.invoke(prompt)
+    except Exception:
+        return [None] * len(batch)
+
+    return _parse_batch_response(raw_response, len(batch))
+
+
+def _parse_batch_response(raw_response: str, count: int) -> list[Optional[str]]:
+    """
+    Parses a JSON array of labels; invalid items come back as None.
+    """
+
+    failed = [None] * count
+    if not raw_response:
+        return failed
+
+    start, end = raw_response.find("["), raw_response.rfind("]")
+    if start == -1 or end <= start:
+        return failed
+
+    try:
+        items = json.loads(raw_response[start:end + 1])
+    except ValueError:
+        return failed
+
+    # A short or long array cannot be aligned with the inputs
+    if not isinstance(items, list) or len(items) != count:
+        return failed
+
+    labels = []
+    for item in items:
+        label = _normalize_label(item) if isinstance(item, str) else ""
+        labels.append(label if label in _ALLOWED_LABELS else None)
+    return labels
+
+
 # ------------------------------------------------------------------
 # NORMALIZATION & VALIDATION
 # ------------------------------------------------------------------
@@ -85,6 +431,18 @@ _LABEL_SYNONYMS = {
 }
 
 
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+# A keyword listed earlier in _LABEL_SYNONYMS wins over later ones,
+# wherever each occurs in the text. The zero-width lookahead reports a
+# match at every position (not just non-overlapping ones); alternatives
+# are in dict order, so each position yields its highest-priority keyword.
+_SYNONYM_PRIORITY = {keyword: index for index, keyword in enumerate(_LABEL_SYNONYMS)}
+_SYNONYM_PATTERN = re.compile(
+    "(?=(" + "|".join(map(re.escape, _LABEL_SYNONYMS)) + "))"
+)
+
+
 def _normalize_label(raw_response: str) -> str:
     """
     Cleans and normalizes raw LLM output into a canonical label.
@@ -97,7 +455,7 @@ def _normalize_label(raw_response: str) -> str:
     text = raw_response.strip().lower()
 
     # Remove punctuation and markdown noise
-    text = re.sub(r"[^\w\s]", "", text)
+    text = _PUNCTUATION_PATTERN.sub("", text)
     text = text.replace("\n", " ").strip()
 
     # Exact match
@@ -109,10 +467,10 @@ def _normalize_label(raw_response: str) -> str:
     if text in _ALLOWED_LABELS:
         return text
 
-    # Synonym mapping
-    for keyword, canonical_label in _LABEL_SYNONYMS.items():
-        if keyword in text:
-            return canonical_label
+    # Synonym mapping (single scan, first keyword in dict order wins)
+    keywords = _SYNONYM_PATTERN.findall(text)
+    if keywords:
+        return _LABEL_SYNONYMS[min(keywords, key=_SYNONYM_PRIORITY.__getitem__)]
 
     # Nothing matched → invalid
     return ""
@@ -0,0 +1,356 @@
+"""
+Local fast-path classifier for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Classify obvious messages without a remote LLM call
+- Stage 1: compiled keyword / regex rules (greetings, ticket status,
+  clear praise or complaint phrases)
+- Stage 2: hashed bag-of-words logistic regression trained from the
+  labels the LLM classifier already logged
+- Report a confidence score so low-confidence messages can escalate
+- Track how often messages escalate to the LLM
+
+Usage (from banking_support_ai/):
+    python -m agents.fast_classifier train ../logs/app.log
+    python -m agents.fast_classifier report ../logs/app.log
+"""
+
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from agents.intent_router import GREETINGS
+from utils.text import normalize_message, tokenize
+
+
+LABELS = ("positive_feedback", "negative_feedback", "query")
+
+MODEL_PATH = Path(
+    os.getenv(
+        "FAST_CLASSIFIER_MODEL",
+        Path(__file__).resolve().parent / "fast_classifier_model.json"
+    )
+)
+
+# Messages scoring below this confidence escalate to the LLM
+CONFIDENCE_THRESHOLD = float(os.getenv("FAST_PATH_THRESHOLD", "0.85"))
+
+
+# ------------------------------------------------------------------
+# STAGE 1: RULES
+# ------------------------------------------------------------------
+
+_TICKET_STATUS_PATTERN = re.compile(
+    r"\b(status|update|progress|check)\b.*\bticket\b"
+    r"|\bticket\b.*\b(status|update|progress)\b"
+    r"|\bticket\s*(no\.?|number|#)?\s*#?\d{6}\b"
+)
+
+_PRAISE_PATTERN = re.compile(
+    r"\b(thank you so much|thanks a lot|many thanks|great (job|service|support)"
+    r"|excellent|amazing|wonderful|fantastic|really helpful|very helpful"
+    r"|much appreciated|i appreciate|love (your|the) (app|service|bank))\b"
+)
+
+_COMPLAINT_PATTERN = re.compile(
+    r"\b(not happy|unhappy|terrible|awful|worst|disappointed|frustrated"
+    r"|ridiculous|unacceptable|disgusting|horrible|poor service"
+    r"|(has|have|had)\s*(not|n't)\s+(arrived|received|been)|never (arrived|received)"
+    r"|not working|doesn't work|does not work|charged twice|still waiting)\b"
+)
+
+
+def _rule_label(message: str) -> Optional[tuple[str, float]]:
+    text = normalize_message(message)
+
+    if text in GREETINGS:
+        return "query", 0.99
+
+    if _TICKET_STATUS_PATTERN.search(text):
+        return "query", 0.97
+
+    praise = bool(_PRAISE_PATTERN.search(text))
+    complaint = bool(_COMPLAINT_PATTERN.search(text))
+
+    # Mixed signals ("great app but my card never arrived") → no decision
+    if praise and not complaint:
+        return "positive_feedback", 0.92
+    if complaint and not praise:
+        return "negative_feedback", 0.92
+
+    return None
+
+
+# ------------------------------------------------------------------
+# STAGE 2: HASHED BAG-OF-WORDS LOGISTIC REGRESSION
+# ------------------------------------------------------------------
+
+_N_FEATURES = 1 << 18
+
+
+def _features(message: str) -> list[int]:
+    tokens = tokenize(message)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # crc32 is stable across processes, unlike the built-in hash()
+    return sorted({zlib.crc32(g.encode("utf-8")) % _N_FEATURES for g in grams})
+
+
+class HashedLogisticModel:
+    """
+    Multinomial logistic regression over hashed unigrams + bigrams.
+
+    Weights are kept sparse (feature index -> per-label weights), so the
+    model stays small and prediction costs one dict lookup per token.
+    """
+
+    def __init__(self, weights: Optional[dict] = None, bias: Optional[list] = None):
+        self.weights: dict[int, list[float]] = weights or {}
+        self.bias: list[float] = bias or [0.0] * len(LABELS)
+
+    def _scores(self, features: list[int]) -> list[float]:
+        scores = list(self.bias)
+        for index in features:
+            row = self.weights.get(index)
+            if row is not None:
+                for k in range(len(LABELS)):
+                    scores[k] += row[k]
+        return scores
+
+    @staticmethod
+    def _softmax(scores: list[float]) -> list[float]:
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, message: str) -> tuple[str, float]:
+        probs = self._softmax(self._scores(_features(message)))
+        best = max(range(len(LABELS)), key=probs.__getitem__)
+        return LABELS[best], probs[best]
+
+    def fit(
+        self,
+        samples: list[tuple[str, str]],
+        epochs: int = 15,
+        learning_rate: float = 0.3,
+        l2: float = 1e-4,
+        seed: int = 13
+    ) -> "HashedLogisticModel":
+        data = [(_features(m), LABELS.index(l)) for m, l in samples if l in LABELS]
+        rng = random.Random(seed)
+
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for features, target in data:
+                probs = self._softmax(self._scores(features))
+                for k in range(len(LABELS)):
+                    grad = probs[k] - (1.0 if k == target else 0.0)
+                    self.bias[k] -= learning_rate * grad
+                    for index in features:
+                        row = self.weights.setdefault(index, [0.0] * len(LABELS))
+                        row[k] -= learning_rate * (grad + l2 * row[k])
+        return self
+
+    def save(self, path=MODEL_PATH) -> None:
+        payload = {
+            "labels": list(LABELS),
+            "bias": self.bias,
+            "weights": {str(i): [round(w, 5) for w in row] for i, row in self.weights.items()},
+        }
+        Path(path).write_text(json.dumps(payload, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH) -> Optional["HashedLogisticModel"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        payload = json.loads(path.read_text())
+        if tuple(payload.get("labels", ())) != LABELS:
+            return None
+        weights = {int(i): row for i, row in payload["weights"].items()}
+        return cls(weights=weights, bias=payload["bias"])
+
+
+_model: Optional[HashedLogisticModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _get_model() -> Optional[HashedLogisticModel]:
+    global _model, _model_loaded
+
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = HashedLogisticModel.load()
+                _model_loaded = True
+    return _model
+
+
+def preload() -> bool:
+    """
+    Loads the trained model now rather than on the first message.
+    Returns whether a model is available.
+    """
+
+    return _get_model() is not None
+
+
+def set_model(model: Optional[HashedLogisticModel]) -> None:
+    global _model, _model_loaded
+
+    with _model_lock:
+        _model = model
+        _model_loaded = True
+
+
+# ------------------------------------------------------------------
+# PUBLIC API
+# ------------------------------------------------------------------
+
+_stats = {"rules": 0, "model": 0, "escalated": 0}
+_stats_lock = threading.Lock()
+
+
+def predict(message: str) -> tuple[Optional[str], float, str]:
+    """
+    Runs the local tiers without touching the LLM.
+
+    Returns (label, confidence, stage); stage is "rules", "model" or
+    "none". label is None when no stage produced a prediction.
+    """
+
+    ruled = _rule_label(message)
+    if ruled is not None:
+        return ruled[0], ruled[1], "rules"
+
+    model = _get_model()
+    if model is not None:
+        label, confidence = model.predict(message)
+        return label, confidence, "model"
+
+    return None, 0.0, "none"
+
+
+def fast_classify(
+    message: str,
+    threshold: float = CONFIDENCE_THRESHOLD
+) -> Optional[str]:
+    """
+    Returns a label when a local tier is confident enough, otherwise
+    None (the caller should escalate to the LLM). Updates the
+    escalation counters either way.
+    """
+
+    label, confidence, stage = predict(message)
+    decided = label is not None and confidence >= threshold
+
+    with _stats_lock:
+        _stats[stage if decided else "escalated"] += 1
+
+    return label if decided else None
+
+
+def escalation_report() -> dict:
+    """
+    Returns counts per tier and the share of traffic sent to the LLM.
+    """
+
+    with _stats_lock:
+        total = sum(_stats.values())
+        return {
+            **_stats,
+            "total": total,
+            "escalation_rate": _stats["escalated"] / total if total else 0.0,
+        }
+
+
+# ------------------------------------------------------------------
+# TRAINING DATA FROM LOGS
+# ------------------------------------------------------------------
+
+_LOGGED_LABEL_PATTERN = re.compile(
+    r"\[ClassifierAgent\] INPUT: (?P<message>.*) \| "
+    r"OUTPUT: label=(?P<label>\w+), fallback_used=False\s*$"
+)
+
+
+def load_logged_labels(log_path) -> list[tuple[str, str]]:
+    """
+    Extracts (message, label) pairs for every non-fallback LLM
+    classification recorded in the application log. Understands both
+    the JSON-lines format and the older free-text format.
+
+    JSON records count only with source "llm": labels decided by the
+    fast path or the pre-router would train the model on its own
+    output. Free-text lines were written when every label came from the
+    LLM.
+    """
+
+    samples = []
+    with open(log_path, encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            sample = _parse_logged_label(line)
+            if sample is not None and sample[1] in LABELS:
+                samples.append(sample)
+    return samples
+
+
+def _parse_logged_label(line: str) -> Optional[tuple[str, str]]:
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if (
+            record.get("agent") == "ClassifierAgent"
+            and record.get("fallback_used") is False
+            and record.get("source") == "llm"
+        ):
+            return record.get("input", ""), record.get("label", "")
+        return None
+
+    match = _LOGGED_LABEL_PATTERN.search(line)
+    return (match.group("message"), match.group("label")) if match else None
+
+
+def _main(argv: list[str]) -> int:
+    if len(argv) != 2 or argv[0] not in {"train", "report"}:
+        print("usage: python -m agents.fast_classifier {train|report} LOG_PATH")
+        return 2
+
+    command, log_path = argv
+    samples = load_logged_labels(log_path)
+    if not samples:
+        print(f"No labelled classifier lines found in {log_path}")
+        return 1
+
+    if command == "train":
+        model = HashedLogisticModel().fit(samples)
+        model.save()
+        set_model(model)
+        print(f"Trained on {len(samples)} samples → {MODEL_PATH}")
+
+    agree = 0
+    for message, label in samples:
+        predicted = fast_classify(message)
+        agree += predicted == label
+
+    report = escalation_report()
+    decided = report["total"] - report["escalated"]
+    print(json.dumps(report, indent=2))
+    print(f"Agreement with LLM on fast-path decisions: {agree}/{decided}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -4,7 +4,8 @@ Multi-Agent System.
 """
 
 from utils.logger import log_event
-from database.db import insert_ticket
+from utils.metrics import TICKETS_ATTACHED, TICKETS_CREATED
+from database.store import get_ticket_store
 
 
 # ------------------------------------------------------------------
@@ -31,21 +32,48 @@ def handle_positive_feedback(user_message: str, customer_name: str) -> str:
 # ------------------------------------------------------------------
 
 def handle_negative_feedback(user_message: str, customer_name: str) -> str:
-    ticket_number = insert_ticket(
+    ticket_number, created = get_ticket_store().create_or_attach_ticket(
         issue_description=user_message,
-        status="Open"
+        customer_name=customer_name,
+        status="Open",
+        label="negative_feedback"
     )
+    return _negative_feedback_reply(user_message, ticket_number, created)
 
-    response = (
-        "We apologize for the inconvenience. "
-        f"A new ticket #{ticket_number} has been generated, "
-        "and our team will follow up shortly."
+
+async def ahandle_negative_feedback(user_message: str, customer_name: str) -> str:
+    ticket_number, created = await get_ticket_store().acreate_or_attach_ticket(
+        issue_description=user_message,
+        customer_name=customer_name,
+        status="Open",
+        label="negative_feedback"
     )
+    return _negative_feedback_reply(user_message, ticket_number, created)
+
+
+def _negative_feedback_reply(user_message: str, ticket_number: int, created: bool) -> str:
+    if created:
+        TICKETS_CREATED.inc(agent="FeedbackHandlerAgent")
+        response = (
+            "We apologize for the inconvenience. "
+            f"A new ticket #{ticket_number} has been generated, "
+            "and our team will follow up shortly."
+        )
+        output_text = f"Negative feedback logged with ticket #{ticket_number}"
+    else:
+        TICKETS_ATTACHED.inc(agent="FeedbackHandlerAgent")
+        response = (
+            "We apologize for the inconvenience. "
+            f"We’ve added this to your open ticket #{ticket_number}, "
+            "and our team will follow up shortly."
+        )
+        output_text = f"Negative feedback attached to ticket #{ticket_number}"
 
     log_event(
         agent="FeedbackHandlerAgent",
         input_text=user_message,
-        output_text=f"Negative feedback logged with ticket #{ticket_number}"
+        output_text=output_text,
+        ticket_number=ticket_number
     )
 
     return response
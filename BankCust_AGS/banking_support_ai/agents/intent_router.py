@@ -0,0 +1,95 @@
+"""
+Intent pre-router for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Extract, in one pass of one precompiled pattern, everything the
+  query path needs: ticket numbers, "ticket" mentions and references
+  to the customer's last ticket
+- Recognize bare greetings with a set lookup
+- Decide which turns are deterministic (greetings, status lookups with
+  an explicit ticket number) so the controller can skip classification
+
+Runs before any classifier; it never calls an LLM or the database.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+from utils.text import normalize_message
+
+
+GREETINGS = frozenset({
+    "hello", "hi", "hey",
+    "good morning", "good afternoon", "good evening",
+    "thanks", "thank you", "ok", "okay"
+})
+
+# Alternatives are tried left to right at each position, so a
+# "my ticket" reference is consumed before the bare "ticket" branch.
+_INTENT_PATTERN = re.compile(
+    r"(?P<last_ref>\b(?:last|my|previous)\s+ticket\b)"
+    r"|(?P<ticket>\btickets?\b)"
+    r"|(?P<hash>#)?\b(?P<number>\d+)\b"
+)
+
+GREETING = "greeting"
+TICKET_STATUS = "ticket_status"
+TICKET_REFERENCE = "ticket_reference"
+GENERAL = "general"
+
+# Intents answered without running the classifier (label is 'query')
+PREROUTED_INTENTS = frozenset({GREETING, TICKET_STATUS})
+
+
+class Intent(NamedTuple):
+    kind: str
+    ticket_number: Optional[int] = None
+    mentions_ticket: bool = False
+    last_ticket_reference: bool = False
+
+    @property
+    def prerouted(self) -> bool:
+        return self.kind in PREROUTED_INTENTS
+
+
+def detect_intent(message: str) -> Intent:
+    """
+    Returns the structured intent of a user message.
+
+    - greeting: the whole message is a greeting
+    - ticket_status: a number alongside "ticket" (or written as #123)
+    - ticket_reference: mentions a ticket but gives no number
+    - general: anything else (ticket_number still holds the first
+      number, if any)
+    """
+
+    # Same normalizer as the fast classifier, so "Thanks!" is a greeting
+    # on both paths; the pattern below still sees "#" and digits as typed
+    if normalize_message(message) in GREETINGS:
+        return Intent(GREETING)
+
+    text = message.lower()
+
+    ticket_number = None
+    mentions_ticket = last_ticket_reference = hashed = False
+
+    for match in _INTENT_PATTERN.finditer(text):
+        group = match.lastgroup
+        if group == "number":
+            if ticket_number is None:
+                ticket_number = int(match.group("number"))
+                hashed = match.group("hash") is not None
+        elif group == "last_ref":
+            mentions_ticket = last_ticket_reference = True
+        else:
+            mentions_ticket = True
+
+    if ticket_number is not None and (mentions_ticket or hashed):
+        kind = TICKET_STATUS
+    elif mentions_ticket:
+        kind = TICKET_REFERENCE
+    else:
+        kind = GENERAL
+
+    return Intent(kind, ticket_number, mentions_ticket, last_ticket_reference)
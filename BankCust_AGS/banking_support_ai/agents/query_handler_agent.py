@@ -3,66 +3,97 @@ Query Handler Agent for the Banking Customer Support
 Multi-Agent System.
 """
 
-import re
 from typing import Optional
 
+from agents.intent_router import GREETING, TICKET_REFERENCE, Intent, detect_intent
 from utils.logger import log_event
-from database.db import get_ticket_status, insert_ticket
+from utils.metrics import TICKETS_ATTACHED, TICKETS_CREATED
+from database.store import get_ticket_store
 
 
-def handle_query(user_message: str) -> str:
+def handle_query(
+    user_message: str,
+    customer_name: str = "Customer",
+    intent: Optional[Intent] = None
+) -> str:
     """
-    Handles user queries.
+    Handles user queries. `intent` is the pre-router's result when the
+    controller already computed it.
 
     Logic:
     1. Greeting → polite response
     2. Ticket number present → return status
     3. Explicit ticket reference without number → ask for number
-    4. General informational query → create ticket
+    4. General informational query → create ticket (or attach it to
+       the customer's open ticket for the same question)
     """
 
-    message_lower = user_message.lower().strip()
+    intent = intent or detect_intent(user_message)
 
-    # --------------------------------------------------------------
-    # CASE 0: Greeting
-    # --------------------------------------------------------------
-    if _is_greeting(message_lower):
-        response = "Hello! How can I assist you today?"
+    response = _reply_without_store(user_message, intent)
+    if response is not None:
+        return response
 
-        log_event(
-            agent="QueryHandlerAgent",
-            input_text=user_message,
-            output_text="Greeting detected – no ticket created"
-        )
+    if intent.ticket_number is not None:
+        status = get_ticket_store().get_ticket_status(intent.ticket_number)
+        return _status_reply(user_message, intent.ticket_number, status)
+
+    ticket_number, created = get_ticket_store().create_or_attach_ticket(
+        issue_description=user_message,
+        customer_name=customer_name,
+        status="Open",
+        label="query"
+    )
+    return _ticket_reply(user_message, ticket_number, created)
+
+
+async def ahandle_query(
+    user_message: str,
+    customer_name: str = "Customer",
+    intent: Optional[Intent] = None
+) -> str:
+    """
+    Async variant of handle_query(); awaits the ticket store instead of
+    blocking on it.
+    """
+
+    intent = intent or detect_intent(user_message)
+
+    response = _reply_without_store(user_message, intent)
+    if response is not None:
         return response
 
-    # --------------------------------------------------------------
-    # CASE 1: Ticket number present
-    # --------------------------------------------------------------
-    ticket_number = _extract_ticket_number(message_lower)
+    if intent.ticket_number is not None:
+        status = await get_ticket_store().aget_ticket_status(intent.ticket_number)
+        return _status_reply(user_message, intent.ticket_number, status)
+
+    ticket_number, created = await get_ticket_store().acreate_or_attach_ticket(
+        issue_description=user_message,
+        customer_name=customer_name,
+        status="Open",
+        label="query"
+    )
+    return _ticket_reply(user_message, ticket_number, created)
 
-    if ticket_number is not None:
-        status = get_ticket_status(ticket_number)
 
-        if status:
-            response = f"Your ticket #{ticket_number} is currently marked as: {status}."
-        else:
-            response = (
-                f"We could not find a ticket with number #{ticket_number}. "
-                "Please double-check the number and try again."
-            )
+def _reply_without_store(user_message: str, intent: Intent) -> Optional[str]:
+    # --------------------------------------------------------------
+    # CASE 0: Greeting
+    # --------------------------------------------------------------
+    if intent.kind == GREETING:
+        response = "Hello! How can I assist you today?"
 
         log_event(
             agent="QueryHandlerAgent",
             input_text=user_message,
-            output_text=response
+            output_text="Greeting detected – no ticket created"
         )
         return response
 
     # --------------------------------------------------------------
     # CASE 2: Ticket reference without number
     # --------------------------------------------------------------
-    if "ticket" in message_lower:
+    if intent.ticket_number is None and intent.kind == TICKET_REFERENCE:
         response = (
             "I can help with that. Please provide your ticket number so "
             "I can check the status for you."
@@ -75,41 +106,58 @@ def handle_query(user_message: str) -> str:
         )
         return response
 
-    # --------------------------------------------------------------
-    # CASE 3: General informational query → CREATE TICKET
-    # --------------------------------------------------------------
-    ticket_number = insert_ticket(
-        issue_description=user_message,
-        status="Open"
-    )
+    return None
 
-    response = (
-        "Thank you for reaching out. "
-        f"I’ve created a support ticket #{ticket_number} so our team can "
-        "get back to you with the information you requested."
-    )
+
+# ------------------------------------------------------------------
+# CASE 1: Ticket number present
+# ------------------------------------------------------------------
+
+def _status_reply(user_message: str, ticket_number: int, status: Optional[str]) -> str:
+    if status:
+        response = f"Your ticket #{ticket_number} is currently marked as: {status}."
+    else:
+        response = (
+            f"We could not find a ticket with number #{ticket_number}. "
+            "Please double-check the number and try again."
+        )
 
     log_event(
         agent="QueryHandlerAgent",
         input_text=user_message,
-        output_text=f"General query logged with ticket #{ticket_number}"
+        output_text=response,
+        ticket_number=ticket_number
     )
-
     return response
 
 
 # ------------------------------------------------------------------
-# HELPERS
+# CASE 3: General informational query → CREATE TICKET
 # ------------------------------------------------------------------
 
-def _extract_ticket_number(message: str) -> Optional[int]:
-    match = re.search(r"\b(\d+)\b", message)
-    return int(match.group(1)) if match else None
+def _ticket_reply(user_message: str, ticket_number: int, created: bool) -> str:
+    if created:
+        TICKETS_CREATED.inc(agent="QueryHandlerAgent")
+        response = (
+            "Thank you for reaching out. "
+            f"I’ve created a support ticket #{ticket_number} so our team can "
+            "get back to you with the information you requested."
+        )
+        output_text = f"General query logged with ticket #{ticket_number}"
+    else:
+        TICKETS_ATTACHED.inc(agent="QueryHandlerAgent")
+        response = (
+            "Thank you for reaching out. "
+            f"This is already being handled under your ticket #{ticket_number}; "
+            "I’ve added your message to it."
+        )
+        output_text = f"General query attached to ticket #{ticket_number}"
 
+    log_event(
+        agent="QueryHandlerAgent",
+        input_text=user_message,
+        output_text=output_text,
+        ticket_number=ticket_number
+    )
 
-def _is_greeting(message: str) -> bool:
-    return message in {
-        "hello", "hi", "hey",
-        "good morning", "good afternoon", "good evening",
-        "thanks", "thank you", "ok", "okay"
-    }
+    return response
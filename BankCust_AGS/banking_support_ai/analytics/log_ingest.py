@@ -0,0 +1,282 @@
+"""
+Streaming ingester that turns logs/app.log into day-partitioned Parquet.
+
+Responsibilities:
+- Parse both log formats: JSON lines (current) and the legacy
+  "ts | LEVEL | [Agent] INPUT: ... | OUTPUT: ..." text lines
+- Derive analytics columns (event type, label, fallback, ticket number)
+- Read incrementally from a byte-offset checkpoint, in bounded batches,
+  picking up the rotated predecessor (app.log.1) after a rotation
+- Write one Parquet file per day and batch under day=YYYY-MM-DD/
+  (Hive-style), named by source offset so re-runs are idempotent
+
+Usage (from banking_support_ai/):
+    python -m analytics.log_ingest                 # ingest once
+    python -m analytics.log_ingest --follow        # keep tailing
+    python -m analytics.log_ingest --log ../logs/app.log --out ../logs/parquet
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.logger import LOG_DIR, LOG_FILE_PATH
+
+
+DEFAULT_OUTPUT_DIR = Path(os.getenv("LOG_ARCHIVE_DIR", LOG_DIR / "parquet"))
+
+# Lines parsed per batch; bounds memory regardless of log size
+BATCH_LINES = int(os.getenv("LOG_INGEST_BATCH_LINES", "200000"))
+
+CHECKPOINT_NAME = "_checkpoint.json"
+
+SCHEMA = pa.schema([
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("level", pa.string()),
+    ("agent", pa.string()),
+    ("event", pa.string()),
+    ("input", pa.string()),
+    ("output", pa.string()),
+    ("label", pa.string()),
+    ("fallback_used", pa.bool_()),
+    ("ticket_number", pa.int64()),
+    ("latency_ms", pa.float64()),
+])
+
+
+# ------------------------------------------------------------------
+# PARSING
+# ------------------------------------------------------------------
+
+_TEXT_LINE_PATTERN = re.compile(
+    r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| (?P<level>\w+) \| "
+    r"\[(?P<agent>[^\]]+)\] INPUT: (?P<input>.*?) \| OUTPUT: (?P<output>.*)$"
+)
+_CLASSIFICATION_PATTERN = re.compile(r"label=(?P<label>\w+), fallback_used=(?P<fallback>True|False)")
+_TICKET_PATTERN = re.compile(r"#(\d+)")
+
+
+def _event_type(agent: str, output: str) -> str:
+    if agent == "ClassifierAgent":
+        return "classification"
+    if "logged with ticket" in output:
+        return "ticket_created"
+    if "attached to ticket" in output:
+        return "ticket_attached"
+    if agent == "Controller":
+        return "fallback" if output.startswith("Fallback applied") else "response"
+    return "other"
+
+
+def parse_line(line: str) -> Optional[dict]:
+    """
+    Returns one row (dict keyed by SCHEMA names) or None for lines that
+    are not agent events (tracebacks, blank lines, foreign output).
+    """
+
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if "agent" not in record:
+            return None
+
+        try:
+            ts = datetime.fromisoformat(record["ts"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        output = str(record.get("output", ""))
+        ticket_number = record.get("ticket_number")
+        row = {
+            "ts": ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc),
+            "level": record.get("level"),
+            "agent": record["agent"],
+            "input": record.get("input"),
+            "output": output,
+            "label": record.get("label"),
+            "fallback_used": record.get("fallback_used"),
+            "ticket_number": int(ticket_number) if ticket_number is not None else None,
+            "latency_ms": record.get("latency_ms"),
+        }
+    else:
+        match = _TEXT_LINE_PATTERN.match(line)
+        if match is None:
+            return None
+
+        output = match.group("output")
+        row = {
+            "ts": datetime.strptime(match.group("ts"), "%Y-%m-%d %H:%M:%S")
+                          .replace(tzinfo=timezone.utc),
+            "level": match.group("level"),
+            "agent": match.group("agent"),
+            "input": match.group("input"),
+            "output": output,
+            "label": None,
+            "fallback_used": None,
+            "ticket_number": None,
+            "latency_ms": None,
+        }
+
+        # Structured fields the text format only carried inside OUTPUT
+        classification = _CLASSIFICATION_PATTERN.search(output)
+        if row["agent"] == "ClassifierAgent" and classification:
+            row["label"] = classification.group("label")
+            row["fallback_used"] = classification.group("fallback") == "True"
+        elif row["agent"] != "Controller":
+            ticket = _TICKET_PATTERN.search(output)
+            if ticket:
+                row["ticket_number"] = int(ticket.group(1))
+
+    row["event"] = _event_type(row["agent"], output)
+    return row
+
+
+# ------------------------------------------------------------------
+# CHECKPOINT
+# ------------------------------------------------------------------
+
+def _load_checkpoint(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / CHECKPOINT_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(out_dir: Path, inode: int, offset: int) -> None:
+    # Atomic replace: a crash never leaves a torn checkpoint behind
+    tmp = out_dir / f"{CHECKPOINT_NAME}.tmp"
+    tmp.write_text(json.dumps({"inode": inode, "offset": offset}))
+    os.replace(tmp, out_dir / CHECKPOINT_NAME)
+
+
+# ------------------------------------------------------------------
+# INGESTION
+# ------------------------------------------------------------------
+
+def _write_batch(out_dir: Path, rows: list[dict], inode: int, start_offset: int) -> int:
+    by_day: dict[str, list[dict]] = defaultdict(list)
+    for row in rows:
+        by_day[row["ts"].strftime("%Y-%m-%d")].append(row)
+
+    for day, day_rows in by_day.items():
+        partition = out_dir / f"day={day}"
+        partition.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pylist(day_rows, schema=SCHEMA)
+        # Name derives from the source position, so replaying a batch
+        # after a crash overwrites instead of duplicating
+        pq.write_table(
+            table,
+            partition / f"part-{inode}-{start_offset:012d}.parquet",
+            compression="zstd"
+        )
+
+    return len(rows)
+
+
+def _ingest_file(path: Path, out_dir: Path, offset: int, batch_lines: int) -> tuple[int, int]:
+    """
+    Ingests complete lines of `path` from `offset`; returns
+    (new_offset, rows_written). A trailing partial line is left for the
+    next run.
+    """
+
+    inode = path.stat().st_ino
+    written = 0
+
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+
+        while True:
+            start_offset = offset
+            rows = []
+
+            for _ in range(batch_lines):
+                raw = handle.readline()
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+
+                row = parse_line(raw.decode("utf-8", errors="replace"))
+                if row is not None:
+                    rows.append(row)
+
+            if offset == start_offset:
+                return offset, written
+
+            if rows:
+                written += _write_batch(out_dir, rows, inode, start_offset)
+            _save_checkpoint(out_dir, inode, offset)
+
+
+def ingest(
+    log_path=LOG_FILE_PATH,
+    out_dir=DEFAULT_OUTPUT_DIR,
+    batch_lines: int = BATCH_LINES
+) -> int:
+    """
+    Ingests everything appended since the last checkpoint and returns
+    the number of rows written.
+    """
+
+    log_path, out_dir = Path(log_path), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if not log_path.exists():
+        return 0
+
+    checkpoint = _load_checkpoint(out_dir)
+    inode = log_path.stat().st_ino
+    offset = checkpoint.get("offset", 0)
+    written = 0
+
+    if checkpoint and checkpoint.get("inode") != inode:
+        # The file we were reading was rotated: finish it, then start fresh
+        rotated = log_path.with_name(log_path.name + ".1")
+        if rotated.exists() and rotated.stat().st_ino == checkpoint.get("inode"):
+            _, rows = _ingest_file(rotated, out_dir, offset, batch_lines)
+            written += rows
+        offset = 0
+    elif offset > log_path.stat().st_size:
+        # Truncated in place
+        offset = 0
+
+    _, rows = _ingest_file(log_path, out_dir, offset, batch_lines)
+    return written + rows
+
+
+def _main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest app.log into Parquet")
+    parser.add_argument("--log", default=str(LOG_FILE_PATH))
+    parser.add_argument("--out", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--batch-lines", type=int, default=BATCH_LINES)
+    parser.add_argument("--follow", action="store_true", help="keep tailing the log")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between polls")
+    args = parser.parse_args(argv)
+
+    while True:
+        rows = ingest(args.log, args.out, args.batch_lines)
+        if rows or not args.follow:
+            print(f"Ingested {rows} rows into {args.out}")
+        if not args.follow:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
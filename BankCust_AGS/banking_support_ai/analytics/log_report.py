@@ -0,0 +1,152 @@
+"""
+Aggregate queries over the Parquet log archive written by
+analytics.log_ingest.
+
+Responsibilities:
+- Label distribution of classifier decisions
+- Fallback rate of the classifier
+- Tickets created per hour
+
+Each query scans only the columns it needs, prunes day partitions
+outside the requested range and aggregates record batch by record
+batch, so memory stays bounded by the batch size and the number of
+distinct keys, not by the number of log lines.
+
+Usage (from banking_support_ai/):
+    python -m analytics.log_report
+    python -m analytics.log_report --since 2026-02-01 --until 2026-02-28
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from analytics.log_ingest import DEFAULT_OUTPUT_DIR
+
+
+# ------------------------------------------------------------------
+# SCANNING
+# ------------------------------------------------------------------
+
+def _dataset(archive_dir) -> Optional[ds.Dataset]:
+    archive_dir = Path(archive_dir)
+    if not any(archive_dir.glob("day=*/*.parquet")):
+        return None
+    return ds.dataset(archive_dir, format="parquet", partitioning="hive")
+
+
+def _batches(
+    archive_dir,
+    columns: list[str],
+    event: str,
+    since: Optional[str],
+    until: Optional[str]
+) -> Iterator[pa.RecordBatch]:
+    dataset = _dataset(archive_dir)
+    if dataset is None:
+        return
+
+    # Partition filters on `day` (YYYY-MM-DD strings) skip whole files
+    condition = ds.field("event") == event
+    if since:
+        condition &= ds.field("day") >= since
+    if until:
+        condition &= ds.field("day") <= until
+
+    yield from dataset.to_batches(columns=columns, filter=condition)
+
+
+# ------------------------------------------------------------------
+# QUERIES
+# ------------------------------------------------------------------
+
+def label_distribution(
+    archive_dir=DEFAULT_OUTPUT_DIR,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict[str, int]:
+    """
+    Returns {label: count} over classifier decisions.
+    """
+
+    counts: Counter = Counter()
+    for batch in _batches(archive_dir, ["label"], "classification", since, until):
+        for item in pc.value_counts(batch.column("label")).to_pylist():
+            if item["values"] is not None:
+                counts[item["values"]] += item["counts"]
+    return dict(counts.most_common())
+
+
+def fallback_rate(
+    archive_dir=DEFAULT_OUTPUT_DIR,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict:
+    """
+    Returns {"decisions", "fallbacks", "rate"} over classifier decisions.
+    """
+
+    decisions = fallbacks = 0
+    for batch in _batches(archive_dir, ["fallback_used"], "classification", since, until):
+        column = batch.column("fallback_used")
+        decisions += len(column) - column.null_count
+        fallbacks += pc.sum(column.cast(pa.int64())).as_py() or 0
+
+    return {
+        "decisions": decisions,
+        "fallbacks": fallbacks,
+        "rate": fallbacks / decisions if decisions else 0.0,
+    }
+
+
+def tickets_per_hour(
+    archive_dir=DEFAULT_OUTPUT_DIR,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict[str, int]:
+    """
+    Returns {hour (ISO, UTC): tickets created}, in time order.
+    """
+
+    counts: Counter = Counter()
+    for batch in _batches(archive_dir, ["ts"], "ticket_created", since, until):
+        hours = pc.floor_temporal(batch.column("ts"), unit="hour")
+        for item in pc.value_counts(hours).to_pylist():
+            counts[item["values"].isoformat()] += item["counts"]
+    return dict(sorted(counts.items()))
+
+
+def summary(
+    archive_dir=DEFAULT_OUTPUT_DIR,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> dict:
+    tickets = tickets_per_hour(archive_dir, since, until)
+    return {
+        "labels": label_distribution(archive_dir, since, until),
+        "fallback": fallback_rate(archive_dir, since, until),
+        "tickets_created": sum(tickets.values()),
+        "tickets_per_hour": tickets,
+    }
+
+
+def _main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report on the Parquet log archive")
+    parser.add_argument("--archive", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--since", help="first day, YYYY-MM-DD")
+    parser.add_argument("--until", help="last day, YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(summary(args.archive, args.since, args.until), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
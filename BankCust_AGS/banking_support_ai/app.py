@@ -1,130 +1,439 @@
+import os
 import re
-import sqlite3
-import gradio as gr
-import pandas as pd
+import time
+import uuid
 
-from controller import handle_user_input
-from database.db import DB_PATH
+from agents.intent_router import detect_intent
+from bootstrap import bootstrap
+from controller import handle_user_input_stream, async_handle_user_input_stream
+from database.store import TICKET_STATUSES, get_ticket_store, run_in_db_executor
+from utils.metrics import STAGE_LATENCY, start_metrics_server, timed
+from utils.session_store import get_session_store, new_session, record_ticket, record_turn
+from worker_pool import WorkerPoolBusy, get_worker_pool, shutdown_worker_pool
 
 
 # ------------------------------------------------------------
-# SESSION MEMORY (Gradio-managed)
+# SESSION MEMORY (server-side store, keyed by a browser session id)
 # ------------------------------------------------------------
 
-def init_state():
-    return {
-        "last_ticket_number": None
-    }
+def load_session(session_id):
+    """
+    Returns (session_id, session), minting a new id when the browser has
+    none or its session expired from the store.
+    """
+
+    session = get_session_store().get(session_id) if session_id else None
+    if session is None:
+        session_id, session = uuid.uuid4().hex, new_session()
+    return session_id, session
+
+
+def restore_chat(session_id):
+    """
+    Rebuilds the visible conversation after a page reload.
+    """
+
+    session_id, session = load_session(session_id)
+    history = [(message, response) for message, response, _ in session["turns"]]
+    return history, session_id
+
+
+def _finish_turn(session_id, session, message, response, label):
+    _remember_ticket(response, session)
+    record_turn(session, message, response, label)
+    get_session_store().put(session_id, session)
 
 
 # ------------------------------------------------------------
 # CHAT HANDLER
 # ------------------------------------------------------------
 
-def chat_handler(message, chat_history, customer_name, state):
+# Rendered immediately so the user sees the turn was received
+PENDING_REPLY = "…"
+
+# Shown when every worker is busy and the dispatch queue stays full
+BUSY_REPLY = (
+    "We're handling an unusually high number of requests right now. "
+    "Please try again in a moment."
+)
+
+
+def _turn_stream(message, customer_name):
+    # With APP_WORKERS set the turn runs in a worker process and
+    # arrives whole; otherwise it streams from this process
+    pool = get_worker_pool()
+    if pool is None:
+        yield from handle_user_input_stream(user_message=message, customer_name=customer_name)
+        return
+
+    try:
+        response, label = pool.submit(message, customer_name).result()
+    except WorkerPoolBusy:
+        response, label = BUSY_REPLY, None
+    yield response, True, label
+
+
+async def _async_turn_stream(message, customer_name):
+    pool = get_worker_pool()
+    if pool is None:
+        async for item in async_handle_user_input_stream(
+            user_message=message,
+            customer_name=customer_name
+        ):
+            yield item
+        return
+
+    try:
+        response, label = await pool.asubmit(message, customer_name)
+    except WorkerPoolBusy:
+        response, label = BUSY_REPLY, None
+    yield response, True, label
+
+
+def chat_handler(message, chat_history, customer_name, session_id):
     """
-    Handles one user turn and returns updated chat.
+    Handles one user turn, streaming the chat as it progresses: an
+    immediate placeholder, an interim reply once the message is
+    classified, then the final response.
     """
 
-    # Resolve "last / my / previous ticket"
-    if (
-        state["last_ticket_number"]
-        and re.search(r"\b(last|my|previous)\s+ticket\b", message.lower())
-        and not re.search(r"\d{6}", message)
-    ):
-        message = f"{message} (ticket {state['last_ticket_number']})"
+    started = time.perf_counter()
+    session_id, session = load_session(session_id)
+    message = _resolve_ticket_reference(message, session)
+
+    chat_history.append((message, PENDING_REPLY))
+    yield chat_history, session_id
+
+    # Resumed once the placeholder has been handed to the UI
+    STAGE_LATENCY.observe(time.perf_counter() - started, stage="chat_first_chunk")
 
     # Get response from backend
-    response = handle_user_input(
-        user_message=message,
-        customer_name=customer_name
-    )
+    with timed("chat_handler"):
+        for response, done, label in _turn_stream(message, customer_name):
+            if done:
+                _finish_turn(session_id, session, message, response, label)
+            chat_history[-1] = (message, response)
+            yield chat_history, session_id
+
+
+async def async_chat_handler(message, chat_history, customer_name, session_id):
+    """
+    Async variant of chat_handler(); awaits the backend without
+    occupying a Gradio worker thread. Session store reads and writes
+    run on the DB executor so they never block the event loop.
+    """
+
+    started = time.perf_counter()
+    session_id, session = await run_in_db_executor(load_session, session_id)
+    message = _resolve_ticket_reference(message, session)
+
+    chat_history.append((message, PENDING_REPLY))
+    yield chat_history, session_id
 
+    # Resumed once the placeholder has been handed to the UI
+    STAGE_LATENCY.observe(time.perf_counter() - started, stage="chat_first_chunk")
+
+    with timed("chat_handler"):
+        async for response, done, label in _async_turn_stream(message, customer_name):
+            if done:
+                await run_in_db_executor(
+                    _finish_turn, session_id, session, message, response, label
+                )
+            chat_history[-1] = (message, response)
+            yield chat_history, session_id
+
+
+_RESPONSE_TICKET_PATTERN = re.compile(r"#(\d{6})")
+
+
+def _resolve_ticket_reference(message, session):
+    # Resolve "last / my / previous ticket" when no number was given;
+    # the rewritten message then pre-routes straight to a status lookup
+    if not session["last_ticket_number"]:
+        return message
+
+    intent = detect_intent(message)
+    if intent.last_ticket_reference and intent.ticket_number is None:
+        message = f"{message} (ticket {session['last_ticket_number']})"
+    return message
+
+
+def _remember_ticket(response, session):
     # Store last ticket number if present
-    match = re.search(r"#(\d{6})", response)
+    match = _RESPONSE_TICKET_PATTERN.search(response)
     if match:
-        state["last_ticket_number"] = int(match.group(1))
-
-    chat_history.append((message, response))
-    return chat_history, state
+        record_ticket(session, int(match.group(1)))
 
 
 # ------------------------------------------------------------
 # ADMIN VIEW
 # ------------------------------------------------------------
 
-def load_tickets():
+ADMIN_PAGE_SIZE = 50
+TICKET_COLUMNS = ["ticket_number", "issue_description", "status"]
+
+# The UI is customer-facing, so changing a ticket's status is off unless
+# an operator deployment opts in with ADMIN_TICKET_UPDATES=1
+ADMIN_TICKET_UPDATES = os.getenv("ADMIN_TICKET_UPDATES", "0") == "1"
+
+
+def load_tickets(status_filter="All", page=None, query=""):
+    """
+    Loads one page of tickets for the admin view: newest first, or best
+    match first when `query` is set (full-text search).
+
+    `page` holds the cursor stack: one `before_ticket` (browse) or row
+    offset (search) per page visited, so only ADMIN_PAGE_SIZE rows are
+    ever read.
+    """
+
+    # Only the admin view needs pandas; keep it off the start-up path
+    import pandas as pd
+
+    page = page or {"cursors": [None]}
+    status = None if status_filter in (None, "", "All") else status_filter
+    query = (query or "").strip()
+    cursor = page["cursors"][-1]
+    store = get_ticket_store()
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(
-            "SELECT ticket_number, issue_description, status FROM support_tickets",
-            conn
+        # Fetch one extra row to know whether a next page exists
+        if query:
+            offset = cursor or 0
+            rows = store.search_tickets(
+                query,
+                status=status,
+                offset=offset,
+                limit=ADMIN_PAGE_SIZE + 1
+            )
+        else:
+            rows = store.list_tickets(
+                status=status,
+                before_ticket=cursor,
+                limit=ADMIN_PAGE_SIZE + 1
+            )
+            total = store.count_tickets(status)
+    except Exception as e:
+        return pd.DataFrame(columns=TICKET_COLUMNS), page, f"Error loading tickets: {e}"
+
+    page["has_more"] = len(rows) > ADMIN_PAGE_SIZE
+    rows = rows[:ADMIN_PAGE_SIZE]
+
+    if query:
+        page["next_cursor"] = offset + len(rows)
+    else:
+        page["next_cursor"] = rows[-1][0] if rows else None
+
+    if not rows:
+        info = "No tickets found."
+    elif query:
+        info = (
+            f"Page {len(page['cursors'])} · matches {offset + 1}–{offset + len(rows)} "
+            f"for “{query}”"
+        )
+    else:
+        info = (
+            f"Page {len(page['cursors'])} · tickets #{rows[0][0]}–#{rows[-1][0]} "
+            f"· {total} total"
         )
-        conn.close()
 
-        if df.empty:
-            return "No tickets found."
-        return df
+    return pd.DataFrame(rows, columns=TICKET_COLUMNS), page, info
+
+
+def next_tickets_page(status_filter, page, query=""):
+    page = page or {"cursors": [None]}
+    if page.get("has_more"):
+        page["cursors"].append(page["next_cursor"])
+    return load_tickets(status_filter, page, query)
+
+
+def previous_tickets_page(status_filter, page, query=""):
+    page = page or {"cursors": [None]}
+    if len(page["cursors"]) > 1:
+        page["cursors"].pop()
+    return load_tickets(status_filter, page, query)
+
+
+def first_tickets_page(status_filter, query=""):
+    return load_tickets(status_filter, None, query)
 
-    except Exception as e:
-        return f"Error loading tickets: {e}"
+
+def set_ticket_status(ticket_number, new_status, status_filter, page, query=""):
+    """
+    Admin action: updates one ticket's status, then reloads the current
+    page so the change is visible. Refused unless ADMIN_TICKET_UPDATES
+    is enabled.
+    """
+
+    if not ADMIN_TICKET_UPDATES:
+        df, page, _ = load_tickets(status_filter, page, query)
+        return df, page, "Ticket status updates are disabled."
+
+    try:
+        updated = get_ticket_store().update_ticket_status(int(ticket_number), new_status)
+    except (TypeError, ValueError) as e:
+        df, page, _ = load_tickets(status_filter, page, query)
+        return df, page, f"Could not update ticket: {e}"
+
+    df, page, info = load_tickets(status_filter, page, query)
+    if not updated:
+        return df, page, f"Ticket #{int(ticket_number)} not found."
+    return df, page, f"Ticket #{int(ticket_number)} set to {new_status}. {info}"
 
 
 # ------------------------------------------------------------
 # GRADIO UI
 # ------------------------------------------------------------
 
-with gr.Blocks(title="Banking Customer Support AI") as demo:
+def build_ui():
+    """
+    Builds the Gradio app. Only the front process calls this: worker
+    processes (spawned, so they re-import this module) never import
+    gradio or build the UI.
+    """
 
-    gr.Markdown("## 🏦 Banking Customer Support AI Agent")
-    gr.Markdown(
-        "This assistant handles customer feedback and queries using a "
-        "multi-agent AI architecture with session-based memory."
-    )
+    import gradio as gr
 
-    state = gr.State(init_state())
+    # Falls back to per-tab state on Gradio versions without BrowserState
+    SessionIdState = getattr(gr, "BrowserState", gr.State)
 
-    customer_name = gr.Textbox(
-        label="Customer Name",
-        value="Customer"
-    )
+    with gr.Blocks(title="Banking Customer Support AI") as demo:
 
-    chatbot = gr.Chatbot(label="Conversation")
+        gr.Markdown("## 🏦 Banking Customer Support AI Agent")
+        gr.Markdown(
+            "This assistant handles customer feedback and queries using a "
+            "multi-agent AI architecture with session-based memory."
+        )
 
-    user_input = gr.Textbox(
-        label="Type your message",
-        placeholder="e.g., My debit card has not arrived."
-    )
+        session_id = SessionIdState(None)
 
-    send_btn = gr.Button("Send")
+        customer_name = gr.Textbox(
+            label="Customer Name",
+            value="Customer"
+        )
 
-    send_btn.click(
-        chat_handler,
-        inputs=[user_input, chatbot, customer_name, state],
-        outputs=[chatbot, state]
-    )
+        chatbot = gr.Chatbot(label="Conversation")
 
-    user_input.submit(
-        chat_handler,
-        inputs=[user_input, chatbot, customer_name, state],
-        outputs=[chatbot, state]
-    )
+        user_input = gr.Textbox(
+            label="Type your message",
+            placeholder="e.g., My debit card has not arrived."
+        )
 
-    gr.Markdown("---")
+        send_btn = gr.Button("Send")
 
-    with gr.Accordion("🛠 Admin / Debug View", open=False):
-        admin_output = gr.Dataframe()
-        refresh_btn = gr.Button("Refresh Tickets")
+        # Async handlers run on the event loop, so no per-event
+        # concurrency cap is needed to protect the thread pool.
+        send_btn.click(
+            async_chat_handler,
+            inputs=[user_input, chatbot, customer_name, session_id],
+            outputs=[chatbot, session_id],
+            concurrency_limit=None
+        )
 
-        refresh_btn.click(
-            load_tickets,
-            outputs=admin_output
+        user_input.submit(
+            async_chat_handler,
+            inputs=[user_input, chatbot, customer_name, session_id],
+            outputs=[chatbot, session_id],
+            concurrency_limit=None
         )
 
+        demo.load(restore_chat, inputs=session_id, outputs=[chatbot, session_id])
+
+        gr.Markdown("---")
+
+        with gr.Accordion("🛠 Admin / Debug View", open=False):
+            admin_page = gr.State(None)
+
+            with gr.Row():
+                search_box = gr.Textbox(
+                    label="Search descriptions",
+                    placeholder="e.g., card not arrived"
+                )
+                status_filter = gr.Dropdown(
+                    label="Status",
+                    choices=["All", *TICKET_STATUSES],
+                    value="All"
+                )
+            admin_output = gr.Dataframe()
+            admin_info = gr.Markdown()
+
+            with gr.Row():
+                refresh_btn = gr.Button("Refresh Tickets")
+                prev_btn = gr.Button("◀ Previous")
+                next_btn = gr.Button("Next ▶")
+
+            admin_outputs = [admin_output, admin_page, admin_info]
+
+            refresh_btn.click(
+                first_tickets_page,
+                inputs=[status_filter, search_box],
+                outputs=admin_outputs
+            )
+
+            status_filter.change(
+                first_tickets_page,
+                inputs=[status_filter, search_box],
+                outputs=admin_outputs
+            )
+
+            search_box.submit(
+                first_tickets_page,
+                inputs=[status_filter, search_box],
+                outputs=admin_outputs
+            )
+
+            prev_btn.click(
+                previous_tickets_page,
+                inputs=[status_filter, admin_page, search_box],
+                outputs=admin_outputs
+            )
+
+            next_btn.click(
+                next_tickets_page,
+                inputs=[status_filter, admin_page, search_box],
+                outputs=admin_outputs
+            )
+
+            # Not rendered at all on the customer-facing deployment
+            if ADMIN_TICKET_UPDATES:
+                with gr.Row():
+                    update_ticket_number = gr.Number(label="Ticket #", precision=0)
+                    update_status = gr.Dropdown(
+                        label="New status",
+                        choices=list(TICKET_STATUSES),
+                        value=TICKET_STATUSES[0]
+                    )
+                    update_btn = gr.Button("Update Status")
+
+                update_btn.click(
+                    set_ticket_status,
+                    inputs=[update_ticket_number, update_status, status_filter, admin_page, search_box],
+                    outputs=admin_outputs
+                )
+
+    return demo
+
 
 # ------------------------------------------------------------
 # RUN
 # ------------------------------------------------------------
 
 if __name__ == "__main__":
-    demo.launch()
+    # Prometheus scrape endpoint next to the UI; METRICS_PORT=0 disables it
+    metrics_port = int(os.getenv("METRICS_PORT", "9100"))
+    if metrics_port:
+        start_metrics_server(metrics_port)
+
+    # APP_WORKERS > 0: turns run in worker processes, started (and
+    # bootstrapped) before /ready passes
+    pool = get_worker_pool()
+    if pool is not None:
+        pool.start()
+
+    # /ready reports 503 until this returns
+    bootstrap()
+
+    try:
+        build_ui().launch()
+    finally:
+        shutdown_worker_pool()
@@ -0,0 +1,252 @@
+"""
+Local mock of an OpenAI-compatible chat completions endpoint, used by
+the benchmark harness instead of OpenRouter.
+
+Responsibilities:
+- Serve POST /v1/chat/completions (and /chat/completions)
+- Inject configurable latency (fixed, uniform or lognormal)
+- Inject configurable error responses (429 with Retry-After, 5xx)
+- Answer classifier prompts with plausible labels (single and batch)
+- Stream answers as server-sent events when "stream": true
+
+Usage (from banking_support_ai/):
+    python -m benchmarks.mock_llm_server --port 8089 --latency-ms 120 \
+        --latency-dist lognormal --error-rate 0.02
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ------------------------------------------------------------------
+# CONFIGURATION
+# ------------------------------------------------------------------
+
+class MockConfig:
+    """
+    Behaviour knobs for the mock server. Mutable at runtime so one
+    server can be reused across benchmark phases.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        latency_dist: str = "fixed",
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        error_statuses: tuple = (429, 500, 503),
+        retry_after_s: float = 1.0,
+        seed: int = 7
+    ):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after_s = retry_after_s
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+
+    def sample_latency(self) -> float:
+        with self.lock:
+            if self.latency_dist == "uniform":
+                ms = self.rng.uniform(0, 2 * self.latency_ms)
+            elif self.latency_dist == "lognormal":
+                # Median = latency_ms; sigma controls the tail
+                ms = self.latency_ms * math.exp(self.rng.gauss(0, self.latency_sigma))
+            else:
+                ms = self.latency_ms
+        return max(ms, 0.0) / 1000
+
+    def sample_error(self):
+        with self.lock:
+            self.requests += 1
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                return self.rng.choice(self.error_statuses)
+        return None
+
+
+# ------------------------------------------------------------------
+# CANNED CLASSIFICATION
+# ------------------------------------------------------------------
+
+_NEGATIVE = re.compile(r"not|never|unhappy|terrible|worst|problem|issue|angry|lost|blocked|fail")
+_POSITIVE = re.compile(r"thank|great|love|excellent|happy|appreciate|helpful|amazing")
+_QUOTED = re.compile(r'^\d+\. (".*")$', re.M)
+
+
+def _label_for(text: str) -> str:
+    text = text.lower()
+    if _NEGATIVE.search(text):
+        return "negative_feedback"
+    if _POSITIVE.search(text):
+        return "positive_feedback"
+    return "query"
+
+
+def _answer(prompt: str) -> str:
+    # Batch classifier prompt: numbered JSON-quoted messages
+    batch = _QUOTED.findall(prompt)
+    if batch and "JSON array" in prompt:
+        return json.dumps([_label_for(json.loads(item)) for item in batch])
+
+    match = re.search(r'"""(.*)"""', prompt, re.S)
+    return _label_for(match.group(1) if match else prompt)
+
+
+# ------------------------------------------------------------------
+# HTTP HANDLER
+# ------------------------------------------------------------------
+
+def _make_handler(config: MockConfig):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY
+        # delayed ACKs add ~40 ms to every keep-alive response.
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(config.sample_latency())
+
+            status = config.sample_error()
+            if status is not None:
+                headers = {"Retry-After": f"{config.retry_after_s:g}"} if status == 429 else {}
+                self._send(status, {"error": {"message": "injected failure"}}, headers)
+                return
+
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            content = _answer(prompt)
+
+            if body.get("stream"):
+                self._stream(body.get("model", "mock"), content)
+                return
+
+            self._send(200, {
+                "id": "mock-completion",
+                "object": "chat.completion",
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": len(content.split()),
+                }
+            })
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client gave up (e.g. the losing half of a hedged request)
+                self.close_connection = True
+
+        def _stream(self, model: str, content: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            words = content.split(" ")
+            events = [
+                {"model": model, "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+                for i, word in enumerate(words)
+            ]
+            events.append({
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(words)},
+            })
+
+            try:
+                for event in events:
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n")
+                    time.sleep(config.sample_latency() / max(len(words), 1))
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+        def _write_chunk(self, text: str):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_mock_server(config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Starts the mock server on a daemon thread.
+
+    Returns (server, base_url); base_url is suitable for
+    OPENROUTER_BASE_URL.
+    """
+
+    config = config or MockConfig()
+    server = ThreadingHTTPServer((host, port), _make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        retry_after_s=args.retry_after
+    )
+    server, base_url = start_mock_server(config, args.host, args.port)
+    print(f"Mock LLM listening on {base_url} (Ctrl+C to stop)")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,273 @@
+"""
+Throughput / latency benchmark for the controller pipeline.
+
+Responsibilities:
+- Start the local mock LLM server (or use --llm-url)
+- Point the app at a throwaway SQLite database
+- Replay a synthetic workload through handle_user_input (threads),
+  async_handle_user_input (asyncio) or a worker process pool
+  (processes) at rising concurrency levels
+- Report requests/sec, latency percentiles, LLM calls and DB contention
+- Optionally compare against a saved baseline and fail on regressions
+
+Usage (from banking_support_ai/):
+    python -m benchmarks.run_benchmark --levels 1,8,32 --requests 400
+    python -m benchmarks.run_benchmark --save baseline.json
+    python -m benchmarks.run_benchmark --baseline baseline.json --tolerance 0.2
+    python -m benchmarks.run_benchmark --mode processes --workers 16
+
+In processes mode the classifier cache, DB and LLM metrics live in the
+workers, so --warm has no effect and the db / llm columns read zero.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_llm_server import MockConfig, start_mock_server
+from benchmarks.workload import Workload
+
+
+_TICKET_PATTERN = re.compile(r"#(\d+)")
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(int(q * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+# ------------------------------------------------------------------
+# DRIVERS
+# ------------------------------------------------------------------
+
+def _run_threaded(controller, messages, concurrency):
+    def one(message):
+        started = time.perf_counter()
+        try:
+            response = controller.handle_user_input(message, customer_name="Bench")
+            error = None
+        except Exception as exc:
+            response, error = "", exc
+        return time.perf_counter() - started, response, error
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, messages))
+
+
+def _run_async(controller, messages, concurrency):
+    from utils.http_client import aclose_all
+
+    async def main():
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(message):
+            async with gate:
+                started = time.perf_counter()
+                try:
+                    response = await controller.async_handle_user_input(
+                        message, customer_name="Bench"
+                    )
+                    error = None
+                except Exception as exc:
+                    response, error = "", exc
+                return time.perf_counter() - started, response, error
+
+        try:
+            return await asyncio.gather(*(one(message) for message in messages))
+        finally:
+            await aclose_all()
+
+    return asyncio.run(main())
+
+
+def _run_processes(pool, messages, concurrency):
+    def one(message):
+        started = time.perf_counter()
+        try:
+            response, _ = pool.submit(message, customer_name="Bench").result()
+            error = None
+        except Exception as exc:
+            response, error = "", exc
+        return time.perf_counter() - started, response, error
+
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        return list(threads.map(one, messages))
+
+
+# ------------------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------------------
+
+def run_level(modules, workload, concurrency, requests, mode, warm, pool=None):
+    controller, classifier, metrics = modules
+
+    if not warm:
+        classifier.clear_classifier_cache()
+    metrics.reset_metrics()
+
+    messages = [message for _, message in workload.batch(requests)]
+    if mode == "processes":
+        driver, target = _run_processes, pool
+    else:
+        driver, target = (_run_async if mode == "async" else _run_threaded), controller
+
+    started = time.perf_counter()
+    outcomes = driver(target, messages, concurrency)
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for elapsed, _, _ in outcomes]
+    errors = [error for _, _, error in outcomes if error is not None]
+    locked = sum("locked" in str(error).lower() for error in errors)
+
+    for _, response, _ in outcomes:
+        match = _TICKET_PATTERN.search(response or "")
+        if match:
+            workload.remember_ticket(int(match.group(1)))
+
+    db_insert = metrics.STAGE_LATENCY.quantiles(stage="db_insert_ticket")
+    llm_calls = metrics.LLM_REQUESTS.total()
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "rps": requests / wall if wall else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "errors": len(errors),
+        "db_locked_errors": locked,
+        "db_insert_p95_ms": db_insert[0.95] * 1000,
+        "llm_calls": int(llm_calls),
+    }
+
+
+def _print_table(results):
+    columns = [
+        ("concurrency", "conc", "d"),
+        ("rps", "req/s", ".1f"),
+        ("p50_ms", "p50 ms", ".1f"),
+        ("p95_ms", "p95 ms", ".1f"),
+        ("p99_ms", "p99 ms", ".1f"),
+        ("errors", "errors", "d"),
+        ("db_insert_p95_ms", "db p95 ms", ".2f"),
+        ("db_locked_errors", "locked", "d"),
+        ("llm_calls", "llm", "d"),
+    ]
+    print(" ".join(f"{title:>10}" for _, title, _ in columns))
+    for row in results:
+        print(" ".join(f"{row[key]:>10{spec}}" for key, _, spec in columns))
+
+
+def _compare(results, baseline_path, tolerance) -> list[str]:
+    with open(baseline_path) as handle:
+        baseline = {row["concurrency"]: row for row in json.load(handle)["results"]}
+
+    regressions = []
+    for row in results:
+        base = baseline.get(row["concurrency"])
+        if base is None:
+            continue
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(
+                f"c={row['concurrency']}: throughput {row['rps']:.1f} < baseline {base['rps']:.1f}"
+            )
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"c={row['concurrency']}: p95 {row['p95_ms']:.1f}ms > baseline {base['p95_ms']:.1f}ms"
+            )
+    return regressions
+
+
+def _main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark handle_user_input")
+    parser.add_argument("--levels", default="1,4,16,64", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="requests per level")
+    parser.add_argument("--mode", choices=["threads", "async", "processes"], default="threads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (processes mode)")
+    parser.add_argument("--llm-url", help="use an existing endpoint instead of the mock")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--warm", action="store_true", help="keep the classifier cache between levels")
+    parser.add_argument("--with-logging", action="store_true", help="keep INFO logging enabled")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a saved results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.llm_url:
+        base_url = args.llm_url
+    else:
+        config = MockConfig(
+            latency_ms=args.latency_ms,
+            latency_dist=args.latency_dist,
+            error_rate=args.error_rate,
+            seed=args.seed
+        )
+        _, base_url = start_mock_server(config)
+
+    # Must be set before the app modules read their configuration
+    workdir = tempfile.mkdtemp(prefix="bankcust-bench-")
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+    os.environ["SUPPORT_DB_PATH"] = os.path.join(workdir, "bench.db")
+
+    import controller
+    from agents import classifier_agent
+    from utils import metrics
+
+    if not args.with_logging:
+        logging.getLogger("BankCustAgentLogger").setLevel(logging.WARNING)
+
+    workload = Workload(seed=args.seed)
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+
+    pool = None
+    if args.mode == "processes":
+        from worker_pool import WorkerPool
+
+        # Queue sized so the highest level is measured, not rejected
+        pool = WorkerPool(args.workers, max_queue=max(levels))
+        pool.start()
+
+    try:
+        results = [
+            run_level(
+                (controller, classifier_agent, metrics),
+                workload, level, args.requests, args.mode, args.warm, pool
+            )
+            for level in levels
+        ]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"mode={args.mode} llm={base_url} db={os.environ['SUPPORT_DB_PATH']}")
+    _print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump({"mode": args.mode, "results": results}, handle, indent=2)
+
+    if args.baseline:
+        regressions = _compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,102 @@
+"""
+Synthetic customer traffic for the benchmark harness.
+
+Responsibilities:
+- Generate a reproducible mix of praise, complaints, greetings,
+  ticket-status lookups and general queries
+- Let lookups reference tickets the run itself created
+"""
+
+import random
+
+
+DEFAULT_MIX = {
+    "praise": 0.15,
+    "complaint": 0.30,
+    "greeting": 0.15,
+    "ticket_lookup": 0.20,
+    "general_query": 0.20,
+}
+
+_PRAISE = [
+    "Thank you so much for the quick help with my {product}",
+    "Great service today, the {product} issue was sorted in minutes",
+    "I really appreciate how helpful your team was about my {product}",
+    "Love the new {product}, excellent work",
+]
+
+_COMPLAINTS = [
+    "My {product} has not arrived after {days} days",
+    "I am really unhappy, my {product} was blocked without notice",
+    "This is the worst experience, I was charged twice on my {product}",
+    "The {product} is not working and nobody answers the phone",
+    "Still waiting for a refund on my {product} after {days} days",
+]
+
+_GREETINGS = ["hello", "hi", "hey", "good morning", "thanks", "ok"]
+
+_LOOKUPS = [
+    "What is the status of ticket {ticket}?",
+    "Any update on ticket #{ticket}",
+    "Can you check ticket {ticket} for me",
+]
+
+_QUERIES = [
+    "How do I increase the limit on my {product}?",
+    "Tell me about your {product} options",
+    "What documents do I need to open a {product}?",
+    "Which branch offers {product} appointments on Saturday?",
+]
+
+_PRODUCTS = [
+    "debit card", "credit card", "savings account", "mortgage",
+    "personal loan", "mobile app", "treasury services", "wire transfer",
+]
+
+
+class Workload:
+    """
+    Reproducible message generator.
+
+    Ticket lookups use numbers recorded through remember_ticket(), so a
+    run exercises real indexed reads; before any ticket exists they use
+    a random six-digit number (a miss).
+    """
+
+    def __init__(self, mix: dict = None, seed: int = 42):
+        self.mix = mix or DEFAULT_MIX
+        self.rng = random.Random(seed)
+        self.kinds = list(self.mix)
+        self.weights = [self.mix[kind] for kind in self.kinds]
+        self.known_tickets: list[int] = []
+
+    def remember_ticket(self, ticket_number: int) -> None:
+        self.known_tickets.append(ticket_number)
+
+    def next_message(self) -> tuple[str, str]:
+        """
+        Returns (kind, message).
+        """
+
+        kind = self.rng.choices(self.kinds, weights=self.weights)[0]
+        fill = {
+            "product": self.rng.choice(_PRODUCTS),
+            "days": self.rng.randint(2, 30),
+            "ticket": (
+                self.rng.choice(self.known_tickets)
+                if self.known_tickets else self.rng.randint(100000, 999999)
+            ),
+        }
+
+        templates = {
+            "praise": _PRAISE,
+            "complaint": _COMPLAINTS,
+            "greeting": _GREETINGS,
+            "ticket_lookup": _LOOKUPS,
+            "general_query": _QUERIES,
+        }[kind]
+
+        return kind, self.rng.choice(templates).format(**fill)
+
+    def batch(self, size: int) -> list[tuple[str, str]]:
+        return [self.next_message() for _ in range(size)]
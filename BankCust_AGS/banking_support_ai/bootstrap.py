@@ -0,0 +1,114 @@
+"""
+Process start-up for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- One explicit bootstrap() that prepares everything a request needs:
+  logging, database schema, LLM client and the local classifier model
+- Record a start-up profile (seconds per step)
+- Report readiness, so /ready only passes once start-up finished
+
+Module imports stay cheap (heavy dependencies are imported on first
+use); the expensive work happens here, once, before traffic arrives.
+
+Usage (from banking_support_ai/):
+    python -m bootstrap                 # run start-up, print the profile
+    python -X importtime -c "import app" 2> imports.txt
+"""
+
+import threading
+import time
+
+from utils.logger import configure_logging, log_event
+from utils.metrics import register_gauge, set_readiness_check
+
+
+_profile: dict[str, float] = {}
+_ready = threading.Event()
+_lock = threading.Lock()
+
+
+def _initialize_database():
+    from database.store import get_ticket_store
+
+    get_ticket_store().initialize()
+
+
+def _initialize_llm():
+    from controller import get_llm
+
+    get_llm()
+
+
+def _load_fast_classifier():
+    from agents.fast_classifier import preload
+
+    preload()
+
+
+def _import_agents():
+    # Pulls in the routing agents (and their dependencies) ahead of the
+    # first turn instead of during it
+    import agents.classifier_agent  # noqa: F401
+    import agents.feedback_handler_agent  # noqa: F401
+    import agents.query_handler_agent  # noqa: F401
+
+
+_STEPS = (
+    ("logging", configure_logging),
+    ("database", _initialize_database),
+    ("agents", _import_agents),
+    ("fast_classifier", _load_fast_classifier),
+    ("llm", _initialize_llm),
+)
+
+
+def bootstrap() -> dict[str, float]:
+    """
+    Runs every start-up step once and marks the process ready.
+
+    Idempotent; later calls return the recorded profile. A failing step
+    propagates and leaves the process not ready.
+    """
+
+    with _lock:
+        if _ready.is_set():
+            return dict(_profile)
+
+        for name, step in _STEPS:
+            started = time.perf_counter()
+            step()
+            _profile[name] = time.perf_counter() - started
+
+        _profile["total"] = sum(_profile.values())
+        _ready.set()
+
+    log_event(
+        agent="Bootstrap",
+        input_text="startup",
+        output_text=f"Ready in {_profile['total'] * 1000:.1f} ms",
+        **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in _profile.items()}
+    )
+    return dict(_profile)
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def startup_profile() -> dict[str, float]:
+    return dict(_profile)
+
+
+set_readiness_check(is_ready)
+register_gauge(
+    "startup_seconds",
+    "Wall time of bootstrap() in seconds.",
+    lambda: _profile.get("total", 0.0)
+)
+
+
+if __name__ == "__main__":
+    profile = bootstrap()
+    for name, seconds in profile.items():
+        print(f"{name:>16} {seconds * 1000:9.1f} ms")
@@ -2,23 +2,57 @@
 Controller module for the Banking Customer Support Multi-Agent System.
 
 Responsibilities:
-- Instantiate the LLM used across agents
+- Instantiate the LLM used across agents (once per process)
 - Receive raw user input
 - Invoke the classifier agent
 - Handle fallback scenarios explicitly
 - Route the request to the appropriate downstream agent
+- Offer an asyncio variant of the pipeline for async UI handlers
+- Record per-stage latency and pipeline counters
+- Shield the pipeline from a slow or failing LLM provider (timeouts,
+  retries, hedged requests, circuit breaker)
+- Route each call to the fastest healthy configured model, with a
+  fallback chain and an optional larger model for escalations
+- Stream progress (interim reply, final response) to streaming UIs
 """
 
+import asyncio
+import json
 import os
-import requests
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import cached_property
+from typing import AsyncIterator, Iterator, Optional
 
-from agents.classifier_agent import classify_message_llm
-from agents.feedback_handler_agent import (
-    handle_positive_feedback,
-    handle_negative_feedback
-)
-from agents.query_handler_agent import handle_query
+from agents.intent_router import Intent, detect_intent
+from utils.http_client import get_async_client, get_session
 from utils.logger import log_event
+from utils.metrics import (
+    CLASSIFICATIONS,
+    LLM_REQUESTS,
+    LLM_RESILIENCE,
+    LLM_TOKENS,
+    STAGE_LATENCY,
+    register_gauge,
+    timed
+)
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy
+)
+
+
+DEFAULT_MODEL = "meta-llama/llama-3.1-8b-instruct"
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Tight per-attempt timeouts; retries stay inside LLM_TOTAL_BUDGET
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "8"))
 
 
 # ------------------------------------------------------------------
@@ -30,24 +64,43 @@ class OpenRouterLLM:
     Minimal OpenRouter LLM wrapper.
 
     Contract:
-    - invoke(prompt: str) -> str
+    - invoke(prompt: str, timeout=None) -> str
+    - ainvoke(prompt: str, timeout=None) -> str  (awaitable)
+    - stream(prompt: str) -> Iterator[str]  (token deltas, stream=true)
+    - astream(prompt: str) -> AsyncIterator[str]
+
+    `timeout` caps the connect and read timeouts of that one request
+    (ResilientLLM passes what is left of its total budget).
     """
 
     def __init__(
         self,
-        model: str = "meta-llama/llama-3.1-8b-instruct",
-        temperature: float = 0.0
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.0,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        session=None,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        read_timeout: float = LLM_READ_TIMEOUT
     ):
-        self.api_key = os.getenv("OPENROUTER_API_KEY")
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY not set")
 
         self.model = model
         self.temperature = temperature
-        self.url = "https://openrouter.ai/api/v1/chat/completions"
 
-    def invoke(self, prompt: str) -> str:
-        headers = {
+        # OPENROUTER_BASE_URL lets tests point at a local stub endpoint
+        base_url = base_url or os.getenv("OPENROUTER_BASE_URL", DEFAULT_BASE_URL)
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+
+        # None means the pooled session shared by every client in the
+        # process, looked up per request (see `session`)
+        self._session = session
+
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             # Optional but recommended by OpenRouter
@@ -55,7 +108,35 @@ class OpenRouterLLM:
             "X-Title": "BankCust_AGS"
         }
 
-        payload = {
+    @property
+    def session(self):
+        # Fetched from the registry on every request, so configure_pool()
+        # takes effect for clients that already exist
+        return self._session or get_session("openrouter")
+
+    @cached_property
+    def async_timeout(self):
+        # httpx is only needed once the async path is used
+        import httpx
+
+        return httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+
+    def _request_timeout(self, cap: Optional[float]) -> tuple[float, float]:
+        if cap is None:
+            return self.timeout
+        return min(self.timeout[0], cap), min(self.timeout[1], cap)
+
+    def _async_request_timeout(self, cap: Optional[float]):
+        if cap is None:
+            return self.async_timeout
+
+        import httpx
+
+        connect, read = self._request_timeout(cap)
+        return httpx.Timeout(read, connect=connect)
+
+    def _payload(self, prompt: str) -> dict:
+        return {
             "model": self.model,
             "temperature": self.temperature,
             "messages": [
@@ -63,16 +144,514 @@ class OpenRouterLLM:
             ]
         }
 
-        response = requests.post(
-            self.url,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
+    def _record_usage(self, data: dict) -> None:
+        usage = data.get("usage") or {}
+        for token_type in ("prompt_tokens", "completion_tokens"):
+            if usage.get(token_type):
+                LLM_TOKENS.inc(usage[token_type], model=self.model, type=token_type)
+
+    def _parse(self, data: dict) -> str:
+        self._record_usage(data)
+        return data["choices"][0]["message"]["content"]
+
+    def _parse_sse_line(self, line: str):
+        """
+        Returns the content delta of one server-sent event line, "" for
+        lines without content (comments, keep-alives, role chunks) and
+        None at the [DONE] sentinel.
+        """
+
+        if not line or not line.startswith("data:"):
+            return ""
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return None
+
+        chunk = json.loads(data)
+        self._record_usage(chunk)
+        choices = chunk.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+
+    def invoke(self, prompt: str, timeout: Optional[float] = None) -> str:
+        try:
+            with timed("llm_invoke"):
+                response = self.session.post(
+                    self.url,
+                    headers=self.headers,
+                    json=self._payload(prompt),
+                    timeout=self._request_timeout(timeout)
+                )
+
+                response.raise_for_status()
+
+                content = self._parse(response.json())
+        except Exception:
+            LLM_REQUESTS.inc(model=self.model, outcome="error")
+            raise
+
+        LLM_REQUESTS.inc(model=self.model, outcome="ok")
+        return content
+
+    async def ainvoke(self, prompt: str, timeout: Optional[float] = None) -> str:
+        client = get_async_client("openrouter")
+
+        try:
+            with timed("llm_invoke"):
+                response = await client.post(
+                    self.url,
+                    headers=self.headers,
+                    json=self._payload(prompt),
+                    timeout=self._async_request_timeout(timeout)
+                )
 
-        response.raise_for_status()
+                response.raise_for_status()
 
-        return response.json()["choices"][0]["message"]["content"]
+                content = self._parse(response.json())
+        except Exception:
+            LLM_REQUESTS.inc(model=self.model, outcome="error")
+            raise
+
+        LLM_REQUESTS.inc(model=self.model, outcome="ok")
+        return content
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        payload = {**self._payload(prompt), "stream": True}
+
+        try:
+            response = self.session.post(
+                self.url,
+                headers=self.headers,
+                json=payload,
+                timeout=self.timeout,
+                stream=True
+            )
+            try:
+                response.raise_for_status()
+                response.encoding = "utf-8"
+
+                for line in response.iter_lines(decode_unicode=True):
+                    delta = self._parse_sse_line(line)
+                    if delta is None:
+                        break
+                    if delta:
+                        yield delta
+            finally:
+                response.close()
+        except Exception:
+            LLM_REQUESTS.inc(model=self.model, outcome="error")
+            raise
+
+        LLM_REQUESTS.inc(model=self.model, outcome="ok")
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        client = get_async_client("openrouter")
+        payload = {**self._payload(prompt), "stream": True}
+
+        try:
+            async with client.stream(
+                "POST",
+                self.url,
+                headers=self.headers,
+                json=payload,
+                timeout=self.async_timeout
+            ) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    delta = self._parse_sse_line(line)
+                    if delta is None:
+                        break
+                    if delta:
+                        yield delta
+        except Exception:
+            LLM_REQUESTS.inc(model=self.model, outcome="error")
+            raise
+
+        LLM_REQUESTS.inc(model=self.model, outcome="ok")
+
+
+# ------------------------------------------------------------------
+# RESILIENCE LAYER
+# ------------------------------------------------------------------
+
+# Runs hedged duplicates; the losing request finishes in the background
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "32")),
+    thread_name_prefix="llm-hedge"
+)
+
+
+class ResilientLLM:
+    """
+    Wraps an LLM client with retries, optional hedging and a circuit
+    breaker. Exposes the same invoke()/ainvoke() contract.
+
+    - Retryable failures (timeouts, 429, 5xx) are retried with jittered
+      backoff, honouring Retry-After, within `total_budget` seconds.
+      Each attempt's timeout is capped by the budget left, so a call
+      never runs past it.
+    - With hedging on, a duplicate request is sent once the primary has
+      run longer than the rolling p95; the first success wins.
+    - After repeated failures the breaker opens and calls raise
+      CircuitOpenError immediately, so the classifier can route to the
+      local fast path instead of waiting on a sick upstream.
+    """
+
+    def __init__(
+        self,
+        llm,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        total_budget: float = 12.0
+    ):
+        self.llm = llm
+        self.model = llm.model
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.total_budget = total_budget
+        self.latency = LatencyTracker()
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.quantile(self.hedge_quantile)
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            LLM_RESILIENCE.inc(event="circuit_open")
+            raise CircuitOpenError(f"LLM circuit open for {self.model}")
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("LLM call exceeded its total budget")
+        return remaining
+
+    def _on_failure(self, attempt: int, exc: Exception, started: float, deadline: float):
+        """
+        Returns the backoff delay before the next attempt, or re-raises.
+        """
+
+        self.latency.record(time.perf_counter() - started, ok=False)
+        delay = self.retry_policy.next_delay(attempt, exc)
+
+        if delay is None or time.monotonic() + delay >= deadline:
+            self.breaker.record_failure()
+            raise exc
+
+        LLM_RESILIENCE.inc(event="retry")
+        return delay
+
+    def _on_success(self, started: float) -> None:
+        self.latency.record(time.perf_counter() - started, ok=True)
+        self.breaker.record_success()
+
+    @contextmanager
+    def _settled(self):
+        """
+        Hands a half-open trial back to the breaker when the call ends
+        without an outcome: CancelledError (client disconnect) or
+        GeneratorExit (stream not consumed to the end).
+        """
+
+        try:
+            yield
+        except Exception:
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    def invoke(self, prompt: str) -> str:
+        self._admit()
+        deadline = time.monotonic() + self.total_budget
+
+        with self._settled():
+            attempt = 0
+            while True:
+                attempt += 1
+                started = time.perf_counter()
+                try:
+                    result = self._invoke_once(prompt, self._remaining(deadline))
+                except Exception as exc:
+                    time.sleep(self._on_failure(attempt, exc, started, deadline))
+                    continue
+
+                self._on_success(started)
+                return result
+
+    async def ainvoke(self, prompt: str) -> str:
+        self._admit()
+        deadline = time.monotonic() + self.total_budget
+
+        with self._settled():
+            attempt = 0
+            while True:
+                attempt += 1
+                started = time.perf_counter()
+                try:
+                    remaining = self._remaining(deadline)
+                    result = await asyncio.wait_for(
+                        self._ainvoke_once(prompt, remaining), remaining
+                    )
+                except Exception as exc:
+                    await asyncio.sleep(self._on_failure(attempt, exc, started, deadline))
+                    continue
+
+                self._on_success(started)
+                return result
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streams token deltas. Not retried or hedged: once tokens reach
+        the user a retry would duplicate them. Still guarded by the
+        circuit breaker.
+        """
+
+        self._admit()
+        started = time.perf_counter()
+        with self._settled():
+            try:
+                yield from self.llm.stream(prompt)
+            except Exception:
+                self.latency.record(time.perf_counter() - started, ok=False)
+                self.breaker.record_failure()
+                raise
+        self._on_success(started)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        self._admit()
+        started = time.perf_counter()
+        with self._settled():
+            try:
+                async for delta in self.llm.astream(prompt):
+                    yield delta
+            except Exception:
+                self.latency.record(time.perf_counter() - started, ok=False)
+                self.breaker.record_failure()
+                raise
+        self._on_success(started)
+
+    def _invoke_once(self, prompt: str, timeout: float) -> str:
+        hedge_after = self._hedge_delay()
+        if hedge_after is None:
+            return self.llm.invoke(prompt, timeout=timeout)
+
+        deadline = time.monotonic() + timeout
+        primary = _hedge_executor.submit(self.llm.invoke, prompt, timeout=timeout)
+        done, _ = wait([primary], timeout=min(hedge_after, timeout))
+        if done:
+            return primary.result()
+
+        LLM_RESILIENCE.inc(event="hedge")
+        pending = {
+            primary,
+            _hedge_executor.submit(self.llm.invoke, prompt, timeout=self._remaining(deadline))
+        }
+        error = None
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self._remaining(deadline),
+                return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _ainvoke_once(self, prompt: str, timeout: float) -> str:
+        # The caller's wait_for enforces the deadline; timeout is passed
+        # down so the HTTP client gives up at the same time
+        hedge_after = self._hedge_delay()
+        if hedge_after is None:
+            return await self.llm.ainvoke(prompt, timeout=timeout)
+
+        primary = asyncio.ensure_future(self.llm.ainvoke(prompt, timeout=timeout))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        LLM_RESILIENCE.inc(event="hedge")
+        pending = {
+            primary,
+            asyncio.ensure_future(self.llm.ainvoke(prompt, timeout=max(timeout - hedge_after, 0.001)))
+        }
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+
+# ------------------------------------------------------------------
+# MODEL ROUTER
+# ------------------------------------------------------------------
+
+class ModelRouter:
+    """
+    Latency-aware router over several (resilient) LLM clients.
+
+    Contract:
+    - invoke(prompt) / ainvoke(prompt): sent to the fastest healthy
+      client (lowest rolling p50); on failure the next client in the
+      ranking is tried, so the ranking doubles as the fallback chain.
+    - escalate(prompt) / aescalate(prompt): sent to the larger
+      escalation model, or None when none is configured. The classifier
+      uses this only when the cheap tier's output fails validation.
+
+    A client is unhealthy while its circuit is open or its error rate
+    over the last `error_window` seconds exceeds `max_error_rate`.
+    Errors older than that no longer count, so a demoted client that
+    gets no traffic becomes healthy again and is re-measured. Clients
+    with fewer than `min_samples` observations rank first so every
+    model gets measured, and a small `explore_rate` keeps estimates
+    fresh.
+    """
+
+    def __init__(
+        self,
+        clients: list,
+        escalation=None,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        explore_rate: float = 0.05,
+        error_window: float = 60.0
+    ):
+        if not clients:
+            raise ValueError("ModelRouter needs at least one client")
+
+        self.clients = list(clients)
+        self.escalation = escalation
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.explore_rate = explore_rate
+        self.error_window = error_window
+        self._rng = random.Random()
+
+        # Stable identity for cache keys: the configured cheap tier
+        self.model = "+".join(client.model for client in self.clients)
+
+    def _healthy(self, client) -> bool:
+        breaker = getattr(client, "breaker", None)
+        if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+            return False
+        tracker = getattr(client, "latency", None)
+        return tracker is None or tracker.error_rate(self.error_window) <= self.max_error_rate
+
+    def _expected_latency(self, client) -> float:
+        tracker = getattr(client, "latency", None)
+        if tracker is None or len(tracker) < self.min_samples:
+            return 0.0
+        return tracker.quantile(0.5) or 0.0
+
+    def ranked(self) -> list:
+        """
+        Clients in the order they will be tried for the next call.
+        """
+
+        healthy = [c for c in self.clients if self._healthy(c)]
+        unhealthy = [c for c in self.clients if not self._healthy(c)]
+        healthy.sort(key=self._expected_latency)
+
+        if len(healthy) > 1 and self._rng.random() < self.explore_rate:
+            healthy.insert(0, healthy.pop(self._rng.randrange(1, len(healthy))))
+
+        # Unhealthy clients stay at the end as a last resort; open
+        # circuits reject instantly, so trying them costs nothing.
+        return healthy + unhealthy
+
+    def invoke(self, prompt: str) -> str:
+        error = None
+        for position, client in enumerate(self.ranked()):
+            if position:
+                LLM_RESILIENCE.inc(event="router_fallback", model=client.model)
+            try:
+                return client.invoke(prompt)
+            except Exception as exc:
+                error = exc
+        raise error
+
+    async def ainvoke(self, prompt: str) -> str:
+        error = None
+        for position, client in enumerate(self.ranked()):
+            if position:
+                LLM_RESILIENCE.inc(event="router_fallback", model=client.model)
+            try:
+                return await client.ainvoke(prompt)
+            except Exception as exc:
+                error = exc
+        raise error
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streams from the best-ranked client, falling back to the next one
+        only if a client fails before producing its first token.
+        """
+
+        error = None
+        for client in self.ranked():
+            emitted = False
+            try:
+                for delta in client.stream(prompt):
+                    emitted = True
+                    yield delta
+                return
+            except Exception as exc:
+                if emitted:
+                    raise
+                error = exc
+        raise error
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        error = None
+        for client in self.ranked():
+            emitted = False
+            try:
+                async for delta in client.astream(prompt):
+                    emitted = True
+                    yield delta
+                return
+            except Exception as exc:
+                if emitted:
+                    raise
+                error = exc
+        raise error
+
+    def escalate(self, prompt: str) -> Optional[str]:
+        if self.escalation is None:
+            return None
+        LLM_RESILIENCE.inc(event="escalation", model=self.escalation.model)
+        return self.escalation.invoke(prompt)
+
+    async def aescalate(self, prompt: str) -> Optional[str]:
+        if self.escalation is None:
+            return None
+        LLM_RESILIENCE.inc(event="escalation", model=self.escalation.model)
+        return await self.escalation.ainvoke(prompt)
+
+    def open_circuits(self) -> int:
+        clients = self.clients + ([self.escalation] if self.escalation else [])
+        return sum(
+            getattr(c, "breaker", None) is not None and c.breaker.state == CircuitBreaker.OPEN
+            for c in clients
+        )
 
 
 # ------------------------------------------------------------------
@@ -81,79 +660,370 @@ class OpenRouterLLM:
 
 def initialize_llm():
     """
-    Initializes and returns an OpenRouter-hosted LLaMA model.
+    Initializes and returns the model router.
+
+    LLM_MODELS is a comma-separated list of cheap models (default: the
+    OpenRouter-hosted LLaMA 3.1 8B); LLM_ESCALATION_MODEL optionally
+    names a larger model used only when the cheap tier's label is
+    invalid. Each model is wrapped in the resilience layer.
 
     Agents remain model-agnostic.
     """
 
-    return OpenRouterLLM(
-        model="meta-llama/llama-3.1-8b-instruct",
-        temperature=0.0
+    models = [
+        name.strip()
+        for name in os.getenv("LLM_MODELS", DEFAULT_MODEL).split(",")
+        if name.strip()
+    ]
+    escalation_model = os.getenv("LLM_ESCALATION_MODEL")
+
+    return ModelRouter(
+        [_resilient_client(model) for model in models],
+        escalation=_resilient_client(escalation_model) if escalation_model else None,
+        error_window=float(os.getenv("LLM_ROUTER_ERROR_WINDOW", "60"))
     )
 
 
+def _resilient_client(model: str) -> ResilientLLM:
+    return ResilientLLM(
+        OpenRouterLLM(
+            model=model,
+            temperature=0.0
+        ),
+        retry_policy=RetryPolicy(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "2.0"))
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30"))
+        ),
+        hedge=os.getenv("LLM_HEDGE", "false").lower() == "true",
+        total_budget=float(os.getenv("LLM_TOTAL_BUDGET", "12"))
+    )
+
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """
+    Returns the process-wide LLM client, creating it on first use.
+    """
+
+    global _llm
+
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = initialize_llm()
+    return _llm
+
+
+def set_llm(llm) -> None:
+    """
+    Replaces the process-wide LLM client (e.g. with a stub for tests).
+    Passing None forces re-initialization on the next call.
+    """
+
+    global _llm
+
+    with _llm_lock:
+        _llm = llm
+
+
+# ------------------------------------------------------------------
+# SCRAPE-TIME GAUGES
+# ------------------------------------------------------------------
+
+# Agents are imported on first use (see _route), keeping start-up light
+def _classifier_cache_stats() -> dict:
+    from agents.classifier_agent import classifier_cache_stats
+
+    return classifier_cache_stats()
+
+
+def _escalation_report() -> dict:
+    from agents.fast_classifier import escalation_report
+
+    return escalation_report()
+
+
+register_gauge(
+    "classifier_cache_hit_ratio",
+    "Hit ratio of the in-memory classification cache.",
+    lambda: _classifier_cache_stats()["memory"]["hit_rate"]
+)
+register_gauge(
+    "llm_circuit_open",
+    "Number of configured models whose circuit breaker is open.",
+    lambda: _llm.open_circuits() if isinstance(_llm, ModelRouter) else 0
+)
+register_gauge(
+    "fast_path_escalation_ratio",
+    "Share of messages the local fast path escalated to the LLM.",
+    lambda: _escalation_report()["escalation_rate"]
+)
+register_gauge(
+    "classifier_coalesced_total",
+    "LLM classifications served by joining an identical in-flight call.",
+    lambda: _classifier_cache_stats()["coalescing"]["shared"]
+)
+
+
 # ------------------------------------------------------------------
 # MAIN CONTROLLER LOGIC
 # ------------------------------------------------------------------
 
+# Sent when the LLM is unreachable and the local tiers could not label
+# the message; no ticket is opened for a guess
+RETRY_REPLY = (
+    "We’re having trouble understanding requests right now. "
+    "Please try again in a few minutes."
+)
+
+# Logged as the classification source of pre-routed turns
+SOURCE_PREROUTER = "prerouter"
+
+# Shown while routing still has work to do (e.g. creating a ticket)
+_INTERIM_REPLIES = {
+    "negative_feedback": "I’m sorry to hear that. Logging this with our support team…",
+    "query": "Let me look into that for you…",
+}
+
+
 def handle_user_input(user_message: str, customer_name: str = "Customer") -> str:
     """
     Main entry point for handling user input.
 
     Steps:
-    1. Initialize LLM
-    2. Classify message using LLM-based classifier agent
+    1. Fetch the shared LLM client
+    2. Classify message (pre-router, local fast path, then the LLM)
     3. Log and handle fallback if needed
     4. Route request using explicit if-else logic
     5. Return final response to user
     """
 
-    llm = initialize_llm()
+    for response, _, _ in handle_user_input_stream(user_message, customer_name):
+        pass
+    return response
+
+
+def handle_user_input_stream(
+    user_message: str,
+    customer_name: str = "Customer"
+) -> Iterator[tuple[str, bool, str]]:
+    """
+    Generator form of handle_user_input() for streaming UIs.
+
+    Yields (text, done, label) triples: an interim reply as soon as the
+    label is known (when routing still has work to do), then the final
+    response with done=True.
+    """
+
+    started = time.perf_counter()
 
     # --- STEP 1: CLASSIFICATION ---
-    label, fallback_used = classify_message_llm(user_message, llm)
+    with timed("preroute"):
+        intent = detect_intent(user_message)
+
+    if intent.prerouted:
+        label, fallback_used, source = "query", False, SOURCE_PREROUTER
+    else:
+        from agents.classifier_agent import classify_message
+
+        with timed("classify"):
+            label, fallback_used, source = classify_message(user_message, get_llm())
+
+    # --- STEP 2: FALLBACK HANDLING ---
+    _log_classification(user_message, label, fallback_used, source)
+
+    if label in _INTERIM_REPLIES and not intent.prerouted:
+        yield _INTERIM_REPLIES[label], False, label
+
+    # --- STEP 3: EXPLICIT ROUTING LOGIC ---
+    with timed("route"):
+        response = _route(label, user_message, customer_name, intent)
+
+    # --- STEP 4: FINAL LOGGING ---
+    _log_response(user_message, response, label, started)
+
+    yield response, True, label
+
+
+async def async_handle_user_input(
+    user_message: str,
+    customer_name: str = "Customer"
+) -> str:
+    """
+    Asyncio variant of handle_user_input().
+
+    The LLM call is awaited on the pooled async HTTP client and the
+    routing step awaits the ticket store's async methods, so concurrent
+    conversations never hold a thread while waiting on the LLM or on a
+    ticket commit.
+    """
+
+    async for response, _, _ in async_handle_user_input_stream(user_message, customer_name):
+        pass
+    return response
+
+
+async def async_handle_user_input_stream(
+    user_message: str,
+    customer_name: str = "Customer"
+) -> AsyncIterator[tuple[str, bool, str]]:
+    """
+    Async generator form of async_handle_user_input(); same
+    (text, done, label) protocol as handle_user_input_stream().
+    """
+
+    started = time.perf_counter()
+
+    with timed("preroute"):
+        intent = detect_intent(user_message)
+
+    if intent.prerouted:
+        label, fallback_used, source = "query", False, SOURCE_PREROUTER
+    else:
+        from agents.classifier_agent import aclassify_message
+
+        with timed("classify"):
+            label, fallback_used, source = await aclassify_message(user_message, get_llm())
+
+    _log_classification(user_message, label, fallback_used, source)
+
+    if label in _INTERIM_REPLIES and not intent.prerouted:
+        yield _INTERIM_REPLIES[label], False, label
+
+    with timed("route"):
+        response = await _aroute(label, user_message, customer_name, intent)
 
+    _log_response(user_message, response, label, started)
+
+    yield response, True, label
+
+
+# ------------------------------------------------------------------
+# PIPELINE STEPS (shared by sync and async entry points)
+# ------------------------------------------------------------------
+
+def _log_classification(user_message: str, label: str, fallback_used: bool, source: str):
+    CLASSIFICATIONS.inc(label=label, fallback=str(fallback_used).lower())
+
+    # `source` (llm / fast / prerouter) lets training keep only the
+    # LLM's own decisions (see fast_classifier.load_logged_labels)
     log_event(
         agent="ClassifierAgent",
         input_text=user_message,
-        output_text=f"label={label}, fallback_used={fallback_used}"
+        output_text=f"label={label}, fallback_used={fallback_used}",
+        label=label,
+        fallback_used=fallback_used,
+        source=source
     )
 
-    # --- STEP 2: FALLBACK HANDLING ---
     if fallback_used:
         log_event(
             agent="Controller",
             input_text=user_message,
-            output_text="Fallback applied: treating input as 'query'"
+            output_text=f"Fallback applied: treating input as '{label}'",
+            fallback_used=True
         )
 
-    # --- STEP 3: EXPLICIT ROUTING LOGIC ---
+
+def _log_response(user_message: str, response: str, label: str, started: float):
+    elapsed = time.perf_counter() - started
+    STAGE_LATENCY.observe(elapsed, stage="pipeline")
+
+    log_event(
+        agent="Controller",
+        input_text=user_message,
+        output_text=response,
+        label=label,
+        latency_ms=round(elapsed * 1000, 2)
+    )
+
+
+def _route(
+    label: str,
+    user_message: str,
+    customer_name: str,
+    intent: Optional[Intent] = None
+) -> str:
+    from agents.classifier_agent import UNAVAILABLE_LABEL
+    from agents.feedback_handler_agent import (
+        handle_negative_feedback,
+        handle_positive_feedback
+    )
+    from agents.query_handler_agent import handle_query
+
     if label == "positive_feedback":
-        response = handle_positive_feedback(
+        return handle_positive_feedback(
             user_message=user_message,
             customer_name=customer_name
         )
 
     elif label == "negative_feedback":
-        response = handle_negative_feedback(
+        return handle_negative_feedback(
             user_message=user_message,
             customer_name=customer_name
         )
 
     elif label == "query":
-        response = handle_query(user_message)
+        return handle_query(user_message, customer_name, intent)
 
-    else:
-        # Should never occur due to classifier safeguards
-        response = (
-            "We’re sorry, but we couldn’t process your request at the moment."
+    elif label == UNAVAILABLE_LABEL:
+        return _retry_reply(user_message)
+
+    # Should never occur due to classifier safeguards
+    return (
+        "We’re sorry, but we couldn’t process your request at the moment."
+    )
+
+
+async def _aroute(
+    label: str,
+    user_message: str,
+    customer_name: str,
+    intent: Optional[Intent] = None
+) -> str:
+    from agents.classifier_agent import UNAVAILABLE_LABEL
+    from agents.feedback_handler_agent import (
+        ahandle_negative_feedback,
+        handle_positive_feedback
+    )
+    from agents.query_handler_agent import ahandle_query
+
+    if label == "positive_feedback":
+        return handle_positive_feedback(
+            user_message=user_message,
+            customer_name=customer_name
         )
 
-    # --- STEP 4: FINAL LOGGING ---
+    elif label == "negative_feedback":
+        return await ahandle_negative_feedback(
+            user_message=user_message,
+            customer_name=customer_name
+        )
+
+    elif label == "query":
+        return await ahandle_query(user_message, customer_name, intent)
+
+    elif label == UNAVAILABLE_LABEL:
+        return _retry_reply(user_message)
+
+    return (
+        "We’re sorry, but we couldn’t process your request at the moment."
+    )
+
+
+def _retry_reply(user_message: str) -> str:
     log_event(
         agent="Controller",
         input_text=user_message,
-        output_text=response
+        output_text="Classifier unavailable – asked the customer to retry",
+        fallback_used=True
     )
-
-    return response
+    return RETRY_REPLY
@@ -2,18 +2,39 @@
 Database layer for the Banking Customer Support
 Multi-Agent System.
 
-Uses SQLite for lightweight, file-based persistence.
+Uses SQLite for lightweight, file-based persistence. This is the
+default TicketStore backend; callers reach it through database/store.py.
 
 Responsibilities:
-- Create support_tickets table (if not exists)
-- Insert new tickets (ID generated by DB)
-- Query ticket status
+- Manage long-lived, tuned connections (one per thread, WAL mode)
+- Create support_tickets table once per process and apply versioned
+  schema migrations (PRAGMA user_version), backfilling in small batches
+- Insert new tickets (ID generated by DB) through a group-commit writer
+- Query ticket status through a read-through LRU/TTL cache
+- Update ticket status (admin), invalidating the cache
+- Page through tickets (keyset) with counts from a maintained counter
+- Full-text search over issue descriptions (FTS5, ranked by bm25)
+- Attach near-duplicate messages to a customer's open ticket (MinHash/LSH)
+- List a customer's tickets and the status backlog by creation time
+- Expose awaitable wrappers that run on a bounded DB executor
 """
 
+import asyncio
+import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+from utils import dedup
+from utils.cache import TTLCache
+from utils.metrics import timed
+
 
 # ------------------------------------------------------------------
 # DATABASE PATH SETUP (CLOUD-SAFE)
@@ -22,70 +43,1062 @@ from typing import Optional
 BASE_DIR = Path(__file__).resolve().parent
 BASE_DIR.mkdir(parents=True, exist_ok=True)
 
-DB_PATH = BASE_DIR / "support_tickets.db"
+DB_PATH = Path(os.getenv("SUPPORT_DB_PATH", BASE_DIR / "support_tickets.db"))
+
+TICKET_STATUSES = ("Open", "In Progress", "Resolved", "Closed")
+
+# Statuses a repeated message may still be attached to
+OPEN_STATUSES = ("Open", "In Progress")
+
+# Near-duplicates within this many seconds join the earlier ticket; 0 disables
+DEDUP_WINDOW_S = float(os.getenv("DEDUP_WINDOW_S", "86400"))
+
+# Names that do not identify anyone (the UI pre-fills "Customer"). Turns
+# under these never join an existing ticket: they may come from
+# unrelated people, and attaching would reveal one person's ticket to another
+ANONYMOUS_CUSTOMER_NAMES = frozenset({"", "customer"})
+
+
+def is_identified_customer(customer_name: Optional[str]) -> bool:
+    """
+    True when `customer_name` names someone, i.e. it is not blank or one
+    of ANONYMOUS_CUSTOMER_NAMES (case-insensitive).
+    """
+
+    return bool(customer_name) and customer_name.strip().lower() not in ANONYMOUS_CUSTOMER_NAMES
+
+
+# Rows per backfill transaction, and the pause between transactions that
+# lets other connections write while an existing database is migrated
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+MIGRATION_BATCH_PAUSE_S = float(os.getenv("MIGRATION_BATCH_PAUSE_MS", "10")) / 1000
 
 
 # ------------------------------------------------------------------
 # DATABASE CONNECTION
 # ------------------------------------------------------------------
 
-def _get_connection():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+# Applied to every new connection. WAL lets readers proceed while a
+# writer commits; NORMAL sync is durable across app crashes in WAL mode.
+# busy_timeout comes first so the switch to WAL waits out other
+# processes opening the same file instead of failing as locked.
+_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_mode=WAL",
+    f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+    f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))}",
+    f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# sqlite3 keeps compiled statements in a per-connection LRU keyed by SQL
+# text; constant query strings below are prepared once per connection.
+_STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_open_connections: set[sqlite3.Connection] = set()
+_connections_lock = threading.Lock()
+
+# Bumped by close_connections(); a thread holding a connection from an
+# older generation opens a new one instead of using the closed handle
+_generation = 0
+
+
+def _open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        cached_statements=_STATEMENT_CACHE_SIZE
+    )
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+
+    with _connections_lock:
+        _open_connections.add(conn)
+    return conn
+
+
+def _release_connection(conn: sqlite3.Connection, pid: int) -> None:
+    # A forked child must never close (and so checkpoint) its parent's
+    # handle; it only stops using it
+    if pid != os.getpid():
+        return
+
+    with _connections_lock:
+        _open_connections.discard(conn)
+    try:
+        conn.close()
+    except sqlite3.ProgrammingError:
+        pass
+
+
+class _ThreadConnection:
+    """
+    Holds one thread's connection in its thread-local storage. When the
+    thread exits its locals are dropped and the finalizer closes the
+    connection, so short-lived threads (e.g. idle server workers that
+    are retired) do not leave handles open until shutdown.
+    """
+
+    __slots__ = ("conn", "pid", "generation", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.generation = _generation
+        weakref.finalize(self, _release_connection, conn, self.pid)
+
+
+def _get_connection() -> sqlite3.Connection:
+    """
+    Returns this thread's long-lived connection, opening it on first use.
+
+    Connections are also keyed by PID so a forked worker never reuses
+    its parent's handle, and by generation so no thread keeps a handle
+    closed by close_connections().
+    """
+
+    holder = getattr(_local, "holder", None)
+    if holder is None or holder.pid != os.getpid() or holder.generation != _generation:
+        holder = _ThreadConnection(_open_connection())
+        _local.holder = holder
+    return holder.conn
+
+
+def close_connections() -> None:
+    """
+    Closes every connection opened by this module (e.g. at shutdown).
+
+    The ticket writer is stopped first so queued inserts are committed
+    on its still-open connection. Threads that touch the database
+    afterwards open fresh connections.
+    """
+
+    global _generation, _schema_ready
+
+    _writer.stop()
+
+    with _connections_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        _generation += 1
+
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+    _status_cache.clear()
+    _schema_ready = False
 
 
 # ------------------------------------------------------------------
 # TABLE INITIALIZATION
 # ------------------------------------------------------------------
 
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
 def initialize_database():
-    with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS support_tickets (
-                ticket_number INTEGER PRIMARY KEY AUTOINCREMENT,
-                issue_description TEXT NOT NULL,
-                status TEXT NOT NULL
+    """
+    Creates the schema. Idempotent; call once at startup.
+    """
+
+    global _schema_ready
+
+    with _schema_lock:
+        with _get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS support_tickets (
+                    ticket_number INTEGER PRIMARY KEY AUTOINCREMENT,
+                    issue_description TEXT NOT NULL,
+                    status TEXT NOT NULL
+                )
+            """)
+
+            # Status filter + keyset paging is served entirely by this index
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_support_tickets_status
+                ON support_tickets (status, ticket_number)
+            """)
+
+            _initialize_ticket_counts(conn)
+            _initialize_search_index(conn)
+            _initialize_dedup_index(conn)
+
+        _apply_migrations(_get_connection())
+        _schema_ready = True
+
+
+def _initialize_ticket_counts(conn: sqlite3.Connection):
+    """
+    Per-status ticket totals, kept current by triggers so the admin view
+    never needs a COUNT(*) scan.
+    """
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_counts (
+            status TEXT PRIMARY KEY,
+            total INTEGER NOT NULL
+        )
+    """)
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_counts_insert
+        AFTER INSERT ON support_tickets
+        BEGIN
+            INSERT INTO ticket_counts (status, total) VALUES (NEW.status, 1)
+            ON CONFLICT(status) DO UPDATE SET total = total + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_counts_delete
+        AFTER DELETE ON support_tickets
+        BEGIN
+            UPDATE ticket_counts SET total = total - 1 WHERE status = OLD.status;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_counts_update
+        AFTER UPDATE OF status ON support_tickets
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE ticket_counts SET total = total - 1 WHERE status = OLD.status;
+            INSERT INTO ticket_counts (status, total) VALUES (NEW.status, 1)
+            ON CONFLICT(status) DO UPDATE SET total = total + 1;
+        END;
+    """)
+
+    # One-off backfill for databases created before the counter existed.
+    # Checked and filled under the write lock: worker processes open the
+    # same file at once, and a second backfill would hit the primary key.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM ticket_counts LIMIT 1").fetchone() is None:
+            conn.execute("""
+                INSERT INTO ticket_counts (status, total)
+                SELECT status, COUNT(*) FROM support_tickets GROUP BY status
+            """)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+# False when this SQLite build lacks FTS5; search then falls back to LIKE
+_fts_available = True
+
+
+def _initialize_search_index(conn: sqlite3.Connection):
+    """
+    FTS5 index over issue_description. External-content table: the text
+    lives only in support_tickets and triggers keep the index in step.
+    """
+
+    global _fts_available
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'support_tickets_fts'"
+    ).fetchone() is not None
+
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS support_tickets_fts USING fts5(
+                issue_description,
+                content='support_tickets',
+                content_rowid='ticket_number',
+                tokenize='porter unicode61'
             )
         """)
+    except sqlite3.OperationalError:
+        _fts_available = False
+        return
+
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS trg_support_tickets_fts_insert
+        AFTER INSERT ON support_tickets
+        BEGIN
+            INSERT INTO support_tickets_fts (rowid, issue_description)
+            VALUES (NEW.ticket_number, NEW.issue_description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_support_tickets_fts_delete
+        AFTER DELETE ON support_tickets
+        BEGIN
+            INSERT INTO support_tickets_fts (support_tickets_fts, rowid, issue_description)
+            VALUES ('delete', OLD.ticket_number, OLD.issue_description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_support_tickets_fts_update
+        AFTER UPDATE OF issue_description ON support_tickets
+        BEGIN
+            INSERT INTO support_tickets_fts (support_tickets_fts, rowid, issue_description)
+            VALUES ('delete', OLD.ticket_number, OLD.issue_description);
+            INSERT INTO support_tickets_fts (rowid, issue_description)
+            VALUES (NEW.ticket_number, NEW.issue_description);
+        END;
+    """)
+
+    # One-off index build for databases created before search existed
+    if not exists:
+        conn.execute(
+            "INSERT INTO support_tickets_fts (support_tickets_fts) VALUES ('rebuild')"
+        )
+
+
+def _initialize_dedup_index(conn: sqlite3.Connection):
+    """
+    MinHash signature per ticket plus an LSH bucket table. Buckets are
+    scoped per customer, so a lookup is a handful of primary-key probes
+    regardless of table size.
+    """
+
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS ticket_signatures (
+            ticket_number INTEGER PRIMARY KEY,
+            customer_name TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            signature BLOB NOT NULL,
+            attached INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS ticket_lsh (
+            bucket INTEGER NOT NULL,
+            ticket_number INTEGER NOT NULL,
+            PRIMARY KEY (bucket, ticket_number)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_signatures_delete
+        AFTER DELETE ON support_tickets
+        BEGIN
+            DELETE FROM ticket_lsh WHERE ticket_number = OLD.ticket_number;
+            DELETE FROM ticket_signatures WHERE ticket_number = OLD.ticket_number;
+        END;
+    """)
+
+
+# ------------------------------------------------------------------
+# SCHEMA MIGRATIONS
+# ------------------------------------------------------------------
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_ticket_metadata(conn: sqlite3.Connection):
+    """
+    v1: customer_name, created_at, updated_at and label on support_tickets.
+
+    Adding the columns only rewrites the schema entry, so that step is a
+    single short transaction. Existing rows are then backfilled from
+    ticket_signatures in ticket_number ranges, one small transaction per
+    range, so writers in other processes keep getting in between batches.
+    Tickets opened before signatures existed keep NULL metadata. The
+    indexes are built last, once the columns are filled; each build is a
+    single sort pass and its own transaction.
+    """
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-checked under the write lock: another process may have
+        # added the columns since we read the version
+        missing = [
+            column for column in (
+                "customer_name TEXT",
+                "created_at REAL",
+                "updated_at REAL",
+                "label TEXT",
+            )
+            if column.split()[0] not in _columns(conn, "support_tickets")
+        ]
+        for column in missing:
+            conn.execute(f"ALTER TABLE support_tickets ADD COLUMN {column}")
+
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_support_tickets_touch
+            AFTER UPDATE OF status, issue_description, label ON support_tickets
+            BEGIN
+                UPDATE support_tickets
+                SET updated_at = (julianday('now') - 2440587.5) * 86400.0
+                WHERE ticket_number = NEW.ticket_number;
+            END
+        """)
         conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    low, high = conn.execute(
+        "SELECT MIN(ticket_number), MAX(ticket_number) FROM support_tickets"
+    ).fetchone()
+
+    if low is not None:
+        start = low - 1
+        while start < high:
+            end = start + MIGRATION_BATCH_SIZE
+            with conn:
+                conn.execute("""
+                    UPDATE support_tickets
+                    SET (customer_name, created_at, updated_at) = (
+                        SELECT s.customer_name, s.created_at, s.created_at
+                        FROM ticket_signatures AS s
+                        WHERE s.ticket_number = support_tickets.ticket_number
+                    )
+                    WHERE ticket_number > ? AND ticket_number <= ?
+                      AND created_at IS NULL
+                """, (start, end))
+            start = end
+            time.sleep(MIGRATION_BATCH_PAUSE_S)
+
+    # "My tickets" reads (ticket_number, status, created_at) from the
+    # first index alone; the backlog is served by the second
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_customer_created "
+        "ON support_tickets (customer_name, created_at, status)",
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_status_created "
+        "ON support_tickets (status, created_at)",
+    ):
+        with conn:
+            conn.execute(statement)
+        time.sleep(MIGRATION_BATCH_PAUSE_S)
+
+
+# Ordered (version, migration). Each step must be safe to re-run: two
+# processes may both see the old version and migrate concurrently.
+_MIGRATIONS = (
+    (1, _migrate_ticket_metadata),
+)
+
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+
+def _apply_migrations(conn: sqlite3.Connection):
+    for version, migrate in _MIGRATIONS:
+        if _schema_version(conn) >= version:
+            continue
+        with timed("db_migration"):
+            migrate(conn)
+        # Bumped only after the step completed, so an interrupted
+        # migration resumes on the next start
+        conn.execute(f"PRAGMA user_version = {version}")
+
+
+def _ensure_schema():
+    # Cheap flag check on the hot path; DDL runs only on first use
+    if not _schema_ready:
+        initialize_database()
 
 
 # ------------------------------------------------------------------
 # INSERT OPERATIONS
 # ------------------------------------------------------------------
 
-def insert_ticket(issue_description: str, status: str) -> int:
+_INSERT_TICKET_SQL = (
+    "INSERT INTO support_tickets "
+    "(issue_description, status, customer_name, label, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+_SELECT_STATUS_SQL = (
+    "SELECT status FROM support_tickets WHERE ticket_number = ?"
+)
+
+
+class _TicketWriter:
+    """
+    Background writer that commits ticket inserts in small batches.
+
+    Callers enqueue a row and block on (or await) a Future carrying their
+    own ticket_number. The writer takes the first queued row, gathers
+    whatever else arrives within `max_delay` seconds (up to `max_batch`
+    rows) and commits them in one transaction, so a burst of complaints
+    costs one fsync per batch instead of one per ticket.
+
+    A writer thread that has died is restarted on the next submit. Callers
+    wait at most TICKET_WRITE_TIMEOUT_S; a row still queued when its caller
+    gives up is dropped rather than written behind the caller's back.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float):
+        self.max_batch = max(max_batch, 1)
+        self.max_delay = max(max_delay, 0.0)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(self, params: tuple) -> Future:
+        self._ensure_running()
+        future: Future = Future()
+        self._queue.put((params, future))
+        return future
+
+    def is_running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive() and self._pid == os.getpid()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None and self._pid == os.getpid():
+                self._queue.put(None)
+                thread.join(timeout=5)
+
+    def _ensure_running(self) -> None:
+        if self.is_running():
+            return
+
+        with self._lock:
+            if not self.is_running():
+                # Threads do not survive fork: children start with an
+                # empty queue. A writer that died in this process is
+                # replaced on the same queue, so rows it left are written.
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    name="ticket-writer",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self, pending: queue.Queue) -> None:
+        conn = _open_connection()
+
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+
+            batch = self._claim([item])
+            stopping = False
+            deadline = time.monotonic() + self.max_delay
+
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    item = pending.get(timeout=timeout) if timeout > 0 else pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.extend(self._claim([item]))
+
+            if batch:
+                self._commit(conn, batch)
+
+            if stopping:
+                return
+
+    @staticmethod
+    def _claim(items: list) -> list:
+        # Drop rows whose caller timed out and cancelled before the writer
+        # got to them; claimed futures can no longer be cancelled.
+        return [
+            (params, future) for params, future in items
+            if future.set_running_or_notify_cancel()
+        ]
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, batch: list) -> None:
+        try:
+            with conn:
+                ticket_numbers = [
+                    conn.execute(_INSERT_TICKET_SQL, params).lastrowid
+                    for params, _ in batch
+                ]
+        except Exception:
+            # Batch rolled back; retry row by row so one bad row only
+            # fails its own caller.
+            for params, future in batch:
+                try:
+                    with conn:
+                        future.set_result(
+                            conn.execute(_INSERT_TICKET_SQL, params).lastrowid
+                        )
+                except Exception as exc:
+                    future.set_exception(exc)
+            return
+
+        for (_, future), ticket_number in zip(batch, ticket_numbers):
+            future.set_result(ticket_number)
+
+
+TICKET_WRITE_TIMEOUT_S = float(os.getenv("TICKET_WRITE_TIMEOUT_S", "30"))
+
+_writer = _TicketWriter(
+    max_batch=int(os.getenv("TICKET_WRITE_MAX_BATCH", "64")),
+    max_delay=float(os.getenv("TICKET_WRITE_MAX_DELAY_MS", "2")) / 1000
+)
+
+
+def _submit_ticket(
+    issue_description: str,
+    status: str,
+    customer_name: Optional[str],
+    label: Optional[str]
+) -> Future:
+    _ensure_schema()
+    now = time.time()
+    return _writer.submit((issue_description, status, customer_name, label, now, now))
+
+
+def insert_ticket(
+    issue_description: str,
+    status: str,
+    customer_name: Optional[str] = None,
+    label: Optional[str] = None
+) -> int:
     """
     Inserts a new support ticket and returns the generated ticket number.
+    `label` is the classifier label that opened the ticket.
+
+    Blocks until the group-commit writer has durably committed the row,
+    or raises TimeoutError after TICKET_WRITE_TIMEOUT_S.
+    """
+
+    with timed("db_insert_ticket"):
+        future = _submit_ticket(issue_description, status, customer_name, label)
+        try:
+            ticket_number = future.result(timeout=TICKET_WRITE_TIMEOUT_S)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    _status_cache.set(ticket_number, status)
+    return ticket_number
+
+
+def create_or_attach_ticket(
+    issue_description: str,
+    customer_name: str,
+    status: str = "Open",
+    label: Optional[str] = None
+) -> tuple[int, bool]:
+    """
+    Opens a ticket unless the same customer already has an open ticket
+    for a near-duplicate issue within DEDUP_WINDOW_S; in that case the
+    message is appended to that ticket instead. Anonymous names (see
+    ANONYMOUS_CUSTOMER_NAMES) always open a new ticket.
+
+    Returns (ticket_number, created).
     """
 
-    initialize_database()
+    signature = dedup.minhash(issue_description)
+    if signature is None or not is_identified_customer(customer_name) or DEDUP_WINDOW_S <= 0:
+        return insert_ticket(issue_description, status, customer_name, label), True
+
+    buckets = dedup.lsh_buckets(signature, scope=customer_name)
+
+    with timed("db_dedup_lookup"):
+        duplicate = _find_duplicate(signature, buckets)
+
+    if duplicate is not None:
+        _attach_to_ticket(duplicate, issue_description)
+        return duplicate, False
+
+    ticket_number = insert_ticket(issue_description, status, customer_name, label)
+    _record_signature(ticket_number, customer_name, signature, buckets)
+    return ticket_number, True
+
 
+def _find_duplicate(signature: tuple, buckets: list[int]) -> Optional[int]:
+    _ensure_schema()
+
+    rows = _get_connection().execute(f"""
+        SELECT DISTINCT s.ticket_number, s.signature
+        FROM ticket_lsh AS l
+        JOIN ticket_signatures AS s ON s.ticket_number = l.ticket_number
+        JOIN support_tickets AS t ON t.ticket_number = l.ticket_number
+        WHERE l.bucket IN ({",".join("?" * len(buckets))})
+          AND s.created_at >= ?
+          AND t.status IN ({",".join("?" * len(OPEN_STATUSES))})
+    """, (*buckets, time.time() - DEDUP_WINDOW_S, *OPEN_STATUSES)).fetchall()
+
+    best, best_score = None, dedup.SIMILARITY_THRESHOLD
+    for ticket_number, blob in rows:
+        score = dedup.similarity(signature, dedup.unpack(blob))
+        if score >= best_score:
+            best, best_score = ticket_number, score
+    return best
+
+
+def _attach_to_ticket(ticket_number: int, message: str) -> None:
     with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO support_tickets (issue_description, status)
-            VALUES (?, ?)
-        """, (issue_description, status))
-        conn.commit()
+        conn.execute(
+            "UPDATE support_tickets "
+            "SET issue_description = issue_description || char(10) || ? "
+            "WHERE ticket_number = ?",
+            (message, ticket_number)
+        )
+        conn.execute(
+            "UPDATE ticket_signatures SET attached = attached + 1 "
+            "WHERE ticket_number = ?",
+            (ticket_number,)
+        )
+
+
+def _record_signature(
+    ticket_number: int,
+    customer_name: str,
+    signature: tuple,
+    buckets: list[int]
+) -> None:
+    with _get_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO ticket_signatures "
+            "(ticket_number, customer_name, created_at, signature) VALUES (?, ?, ?, ?)",
+            (ticket_number, customer_name, time.time(), dedup.pack(signature))
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO ticket_lsh (bucket, ticket_number) VALUES (?, ?)",
+            [(bucket, ticket_number) for bucket in buckets]
+        )
 
-        return cursor.lastrowid
+
+# ------------------------------------------------------------------
+# UPDATE OPERATIONS
+# ------------------------------------------------------------------
+
+def update_ticket_status(ticket_number: int, status: str) -> bool:
+    """
+    Sets a ticket's status (admin action). Returns False when the ticket
+    does not exist.
+    """
+
+    if status not in TICKET_STATUSES:
+        raise ValueError(f"Unknown ticket status: {status!r}")
+
+    _ensure_schema()
+
+    with timed("db_update_ticket_status"):
+        with _get_connection() as conn:
+            updated = conn.execute(
+                "UPDATE support_tickets SET status = ? WHERE ticket_number = ?",
+                (status, ticket_number)
+            ).rowcount
+
+    if updated:
+        _status_cache.set(ticket_number, status)
+    else:
+        _status_cache.pop(ticket_number)
+    return updated > 0
 
 
 # ------------------------------------------------------------------
 # QUERY OPERATIONS
 # ------------------------------------------------------------------
 
+# Customers poll the same ticket repeatedly; repeat lookups are served
+# from memory. Updates through this module invalidate only this
+# process's copy, so the cache is for single-process serving:
+# TICKET_STATUS_CACHE_SIZE=0 turns it off, and worker_pool.py calls
+# disable_ticket_status_cache() in every worker so admin updates made
+# in the front process are seen at once.
+_status_cache = TTLCache(
+    maxsize=int(os.getenv("TICKET_STATUS_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TICKET_STATUS_CACHE_TTL", "30"))
+)
+
+
 def get_ticket_status(ticket_number: int) -> Optional[str]:
-    initialize_database()
+    status = _status_cache.get(ticket_number)
+    if status is not None:
+        return status
+    return _read_ticket_status(ticket_number)
 
-    with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT status
+
+def _read_ticket_status(ticket_number: int) -> Optional[str]:
+    _ensure_schema()
+
+    with timed("db_get_ticket_status"):
+        row = _get_connection().execute(
+            _SELECT_STATUS_SQL, (ticket_number,)
+        ).fetchone()
+
+    # Unknown numbers are not cached: the ticket may be created later
+    if row is None:
+        return None
+
+    _status_cache.set(ticket_number, row[0])
+    return row[0]
+
+
+def ticket_status_cache_stats() -> dict:
+    return _status_cache.stats()
+
+
+def disable_ticket_status_cache() -> None:
+    global _status_cache
+    _status_cache = TTLCache(maxsize=0)
+
+
+def list_tickets(
+    status: Optional[str] = None,
+    before_ticket: Optional[int] = None,
+    limit: int = 50
+) -> list[tuple[int, str, str]]:
+    """
+    Returns one page of (ticket_number, issue_description, status),
+    newest first.
+
+    Keyset pagination: pass the last ticket_number of the previous page
+    as `before_ticket`. Cost is independent of how deep the page is.
+    """
+
+    _ensure_schema()
+
+    clauses, params = [], []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if before_ticket is not None:
+        clauses.append("ticket_number < ?")
+        params.append(before_ticket)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    params.append(max(int(limit), 1))
+
+    with timed("db_list_tickets"):
+        return _get_connection().execute(f"""
+            SELECT ticket_number, issue_description, status
             FROM support_tickets
-            WHERE ticket_number = ?
-        """, (ticket_number,))
-        row = cursor.fetchone()
+            {where}
+            ORDER BY ticket_number DESC
+            LIMIT ?
+        """, params).fetchall()
+
+
+def list_customer_tickets(
+    customer_name: str,
+    since: Optional[float] = None,
+    limit: int = 50
+) -> list[tuple[int, str, Optional[float]]]:
+    """
+    Returns a customer's (ticket_number, status, created_at), newest
+    first, optionally only those created at or after `since` (epoch
+    seconds). Answered from the (customer_name, created_at) index alone.
+    """
+
+    _ensure_schema()
+
+    since_clause = "AND created_at >= ?" if since is not None else ""
+    params = [customer_name, *([since] if since is not None else []), max(int(limit), 1)]
+
+    with timed("db_list_customer_tickets"):
+        return _get_connection().execute(f"""
+            SELECT ticket_number, status, created_at
+            FROM support_tickets
+            WHERE customer_name = ? {since_clause}
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, params).fetchall()
+
+
+def list_backlog(
+    status: str = "Open",
+    created_before: Optional[float] = None,
+    limit: int = 50
+) -> list[tuple[int, Optional[float]]]:
+    """
+    Returns (ticket_number, created_at) for tickets in `status`, oldest
+    first, optionally only those created before `created_before` (epoch
+    seconds). Answered from the (status, created_at) index alone.
+    """
+
+    _ensure_schema()
+
+    before_clause = "AND created_at < ?" if created_before is not None else ""
+    params = [status, *([created_before] if created_before is not None else []), max(int(limit), 1)]
+
+    with timed("db_list_backlog"):
+        return _get_connection().execute(f"""
+            SELECT ticket_number, created_at
+            FROM support_tickets
+            WHERE status = ? {before_clause}
+            ORDER BY created_at
+            LIMIT ?
+        """, params).fetchall()
+
+
+_SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_query(text: str) -> Optional[str]:
+    # Quote every term so user input can never be parsed as FTS5 syntax
+    # (NOT, -, *, unbalanced quotes); the last term matches as a prefix.
+    terms = _SEARCH_TOKEN_PATTERN.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_tickets(
+    text: str,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 50
+) -> list[tuple[int, str, str]]:
+    """
+    Returns one page of (ticket_number, issue_description, status) whose
+    description contains every word of `text`, best match first (bm25).
+
+    Only the requested page is read; pass offset = page * limit.
+    """
+
+    _ensure_schema()
+
+    query = _fts_query(text)
+    if query is None:
+        return []
+
+    status_clause = "AND t.status = ?" if status else ""
+    page = [max(int(limit), 1), max(int(offset), 0)]
+
+    with timed("db_search_tickets"):
+        if _fts_available:
+            params = [query, *([status] if status else []), *page]
+            return _get_connection().execute(f"""
+                SELECT t.ticket_number, t.issue_description, t.status
+                FROM support_tickets_fts AS f
+                JOIN support_tickets AS t ON t.ticket_number = f.rowid
+                WHERE support_tickets_fts MATCH ? {status_clause}
+                ORDER BY f.rank
+                LIMIT ? OFFSET ?
+            """, params).fetchall()
+
+        # No FTS5 in this build: substring scan, newest first
+        terms = _SEARCH_TOKEN_PATTERN.findall(text)
+        like = " AND ".join("t.issue_description LIKE ?" for _ in terms)
+        params = [*(f"%{term}%" for term in terms), *([status] if status else []), *page]
+        return _get_connection().execute(f"""
+            SELECT t.ticket_number, t.issue_description, t.status
+            FROM support_tickets AS t
+            WHERE {like} {status_clause}
+            ORDER BY t.ticket_number DESC
+            LIMIT ? OFFSET ?
+        """, params).fetchall()
+
+
+def count_tickets(status: Optional[str] = None) -> int:
+    """
+    Returns the ticket total (optionally for one status) from the
+    trigger-maintained counter table.
+    """
+
+    _ensure_schema()
+
+    if status:
+        row = _get_connection().execute(
+            "SELECT total FROM ticket_counts WHERE status = ?", (status,)
+        ).fetchone()
+    else:
+        row = _get_connection().execute(
+            "SELECT SUM(total) FROM ticket_counts"
+        ).fetchone()
+
+    return (row[0] or 0) if row else 0
+
+
+def list_ticket_statuses() -> list[str]:
+    _ensure_schema()
+
+    rows = _get_connection().execute(
+        "SELECT status FROM ticket_counts WHERE total > 0 ORDER BY status"
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+# ------------------------------------------------------------------
+# ASYNC WRAPPERS
+# ------------------------------------------------------------------
+
+# SQLite calls are short and local, so a small fixed pool is enough to
+# serve any number of concurrent async conversations.
+_db_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", "4")),
+    thread_name_prefix="db"
+)
+
+
+async def run_in_db_executor(func, *args):
+    """
+    Runs a blocking, DB-bound callable on the DB executor and awaits it.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, func, *args)
+
+
+async def ainsert_ticket(
+    issue_description: str,
+    status: str,
+    customer_name: Optional[str] = None,
+    label: Optional[str] = None
+) -> int:
+    # Awaits the writer's Future directly; no executor thread is held.
+    # On timeout wait_for cancels the wrapper, which cancels the row too
+    # if the writer has not claimed it yet.
+    with timed("db_insert_ticket"):
+        ticket_number = await asyncio.wait_for(
+            asyncio.wrap_future(
+                _submit_ticket(issue_description, status, customer_name, label)
+            ),
+            TICKET_WRITE_TIMEOUT_S
+        )
+
+    _status_cache.set(ticket_number, status)
+    return ticket_number
+
+
+async def acreate_or_attach_ticket(
+    issue_description: str,
+    customer_name: str,
+    status: str = "Open",
+    label: Optional[str] = None
+) -> tuple[int, bool]:
+    """
+    Awaitable create_or_attach_ticket(). The dedup lookup and signature
+    writes take short executor hops; the insert awaits the writer's
+    Future, so no executor thread waits on a group commit.
+    """
+
+    signature = dedup.minhash(issue_description)
+    if signature is None or not is_identified_customer(customer_name) or DEDUP_WINDOW_S <= 0:
+        return await ainsert_ticket(issue_description, status, customer_name, label), True
+
+    buckets = dedup.lsh_buckets(signature, scope=customer_name)
+
+    with timed("db_dedup_lookup"):
+        duplicate = await run_in_db_executor(_find_duplicate, signature, buckets)
+
+    if duplicate is not None:
+        await run_in_db_executor(_attach_to_ticket, duplicate, issue_description)
+        return duplicate, False
+
+    ticket_number = await ainsert_ticket(issue_description, status, customer_name, label)
+    await run_in_db_executor(
+        _record_signature, ticket_number, customer_name, signature, buckets
+    )
+    return ticket_number, True
+
+
+async def aget_ticket_status(ticket_number: int) -> Optional[str]:
+    # Cache hits are answered without an executor hop
+    status = _status_cache.get(ticket_number)
+    if status is not None:
+        return status
+    return await run_in_db_executor(_read_ticket_status, ticket_number)
+
 
-        return row[0] if row else None
+async def aupdate_ticket_status(ticket_number: int, status: str) -> bool:
+    return await run_in_db_executor(update_ticket_status, ticket_number, status)
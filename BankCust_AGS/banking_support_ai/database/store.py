@@ -0,0 +1,283 @@
+"""
+Ticket storage interface for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Define TicketStore: everything the agents and the admin view need
+  from ticket storage (insert, dedup-aware create, status lookup and
+  update, search, pagination, counts)
+- SQLiteTicketStore: the single-file store in database/db.py
+- PostgresTicketStore (database/postgres_store.py): a pooled store on a
+  networked PostgreSQL server, shared by any number of app replicas
+- Store selection from the environment (TICKET_STORE)
+
+Callers use get_ticket_store() and never import a backend directly.
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from database import db
+from database.db import TICKET_STATUSES, run_in_db_executor
+from utils.metrics import register_gauge
+
+
+# ------------------------------------------------------------------
+# INTERFACE
+# ------------------------------------------------------------------
+
+class TicketStore(ABC):
+    """
+    Ticket storage backend.
+
+    Rows are returned as tuples in the column order documented on each
+    method, identical for every backend. Timestamps are epoch seconds.
+    """
+
+    @abstractmethod
+    def initialize(self) -> None:
+        """
+        Creates or migrates the schema. Idempotent; call once at startup.
+        """
+
+    @abstractmethod
+    def insert_ticket(
+        self,
+        issue_description: str,
+        status: str,
+        customer_name: Optional[str] = None,
+        label: Optional[str] = None
+    ) -> int:
+        """
+        Inserts a ticket and returns its generated ticket number.
+        """
+
+    @abstractmethod
+    def create_or_attach_ticket(
+        self,
+        issue_description: str,
+        customer_name: str,
+        status: str = "Open",
+        label: Optional[str] = None
+    ) -> tuple[int, bool]:
+        """
+        Opens a ticket, or appends the message to the customer's open
+        near-duplicate ticket. Returns (ticket_number, created).
+        """
+
+    @abstractmethod
+    def get_ticket_status(self, ticket_number: int) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def update_ticket_status(self, ticket_number: int, status: str) -> bool:
+        """
+        Returns False when the ticket does not exist; raises ValueError
+        for a status outside TICKET_STATUSES.
+        """
+
+    @abstractmethod
+    def list_tickets(
+        self,
+        status: Optional[str] = None,
+        before_ticket: Optional[int] = None,
+        limit: int = 50
+    ) -> list[tuple[int, str, str]]:
+        """
+        Keyset page of (ticket_number, issue_description, status),
+        newest first.
+        """
+
+    @abstractmethod
+    def search_tickets(
+        self,
+        text: str,
+        status: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> list[tuple[int, str, str]]:
+        """
+        Page of (ticket_number, issue_description, status) matching
+        every word of `text`, best match first.
+        """
+
+    @abstractmethod
+    def count_tickets(self, status: Optional[str] = None) -> int:
+        ...
+
+    @abstractmethod
+    def list_ticket_statuses(self) -> list[str]:
+        ...
+
+    @abstractmethod
+    def list_customer_tickets(
+        self,
+        customer_name: str,
+        since: Optional[float] = None,
+        limit: int = 50
+    ) -> list[tuple[int, str, Optional[float]]]:
+        """
+        (ticket_number, status, created_at) for one customer, newest first.
+        """
+
+    @abstractmethod
+    def list_backlog(
+        self,
+        status: str = "Open",
+        created_before: Optional[float] = None,
+        limit: int = 50
+    ) -> list[tuple[int, Optional[float]]]:
+        """
+        (ticket_number, created_at) in `status`, oldest first.
+        """
+
+    @abstractmethod
+    def status_cache_stats(self) -> dict:
+        ...
+
+    @abstractmethod
+    def disable_status_cache(self) -> None:
+        """
+        Stops caching statuses in this process, for processes that do not
+        see every status update (worker processes, shared replicas).
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    # Awaitable variants; backends override them when they can avoid
+    # holding an executor thread
+
+    async def ainsert_ticket(
+        self,
+        issue_description: str,
+        status: str,
+        customer_name: Optional[str] = None,
+        label: Optional[str] = None
+    ) -> int:
+        return await run_in_db_executor(
+            self.insert_ticket, issue_description, status, customer_name, label
+        )
+
+    async def acreate_or_attach_ticket(
+        self,
+        issue_description: str,
+        customer_name: str,
+        status: str = "Open",
+        label: Optional[str] = None
+    ) -> tuple[int, bool]:
+        return await run_in_db_executor(
+            self.create_or_attach_ticket, issue_description, customer_name, status, label
+        )
+
+    async def aget_ticket_status(self, ticket_number: int) -> Optional[str]:
+        return await run_in_db_executor(self.get_ticket_status, ticket_number)
+
+    async def aupdate_ticket_status(self, ticket_number: int, status: str) -> bool:
+        return await run_in_db_executor(self.update_ticket_status, ticket_number, status)
+
+
+# ------------------------------------------------------------------
+# SQLITE
+# ------------------------------------------------------------------
+
+class SQLiteTicketStore(TicketStore):
+    """
+    The SQLite file at SUPPORT_DB_PATH (see database/db.py). Shared by
+    the processes of one host; not by replicas on different hosts.
+    """
+
+    def initialize(self) -> None:
+        db.initialize_database()
+
+    def insert_ticket(self, issue_description, status, customer_name=None, label=None):
+        return db.insert_ticket(issue_description, status, customer_name, label)
+
+    def create_or_attach_ticket(self, issue_description, customer_name, status="Open", label=None):
+        return db.create_or_attach_ticket(issue_description, customer_name, status, label)
+
+    def get_ticket_status(self, ticket_number):
+        return db.get_ticket_status(ticket_number)
+
+    def update_ticket_status(self, ticket_number, status):
+        return db.update_ticket_status(ticket_number, status)
+
+    def list_tickets(self, status=None, before_ticket=None, limit=50):
+        return db.list_tickets(status, before_ticket, limit)
+
+    def search_tickets(self, text, status=None, offset=0, limit=50):
+        return db.search_tickets(text, status, offset, limit)
+
+    def count_tickets(self, status=None):
+        return db.count_tickets(status)
+
+    def list_ticket_statuses(self):
+        return db.list_ticket_statuses()
+
+    def list_customer_tickets(self, customer_name, since=None, limit=50):
+        return db.list_customer_tickets(customer_name, since, limit)
+
+    def list_backlog(self, status="Open", created_before=None, limit=50):
+        return db.list_backlog(status, created_before, limit)
+
+    def status_cache_stats(self):
+        return db.ticket_status_cache_stats()
+
+    def disable_status_cache(self):
+        db.disable_ticket_status_cache()
+
+    def close(self):
+        db.close_connections()
+
+    async def ainsert_ticket(self, issue_description, status, customer_name=None, label=None):
+        return await db.ainsert_ticket(issue_description, status, customer_name, label)
+
+    async def acreate_or_attach_ticket(self, issue_description, customer_name, status="Open", label=None):
+        return await db.acreate_or_attach_ticket(issue_description, customer_name, status, label)
+
+    async def aget_ticket_status(self, ticket_number):
+        return await db.aget_ticket_status(ticket_number)
+
+
+# ------------------------------------------------------------------
+# SHARED STORE
+# ------------------------------------------------------------------
+
+_store: Optional[TicketStore] = None
+_store_lock = threading.Lock()
+
+
+def get_ticket_store() -> TicketStore:
+    """
+    Returns the process-wide store: TICKET_STORE=postgres selects the
+    pooled server store at TICKET_DATABASE_URL, anything else SQLite.
+    """
+
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if os.getenv("TICKET_STORE", "sqlite").lower() in ("postgres", "postgresql"):
+                    # Imported here so SQLite deployments never need psycopg
+                    from database.postgres_store import PostgresTicketStore
+
+                    _store = PostgresTicketStore(os.environ["TICKET_DATABASE_URL"])
+                else:
+                    _store = SQLiteTicketStore()
+    return _store
+
+
+def set_ticket_store(store: Optional[TicketStore]) -> None:
+    global _store
+    _store = store
+
+
+register_gauge(
+    "ticket_status_cache_hit_ratio",
+    "Hit ratio of the in-memory ticket status cache.",
+    lambda: get_ticket_store().status_cache_stats()["hit_rate"]
+)
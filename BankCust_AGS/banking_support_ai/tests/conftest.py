@@ -0,0 +1,39 @@
+"""
+Shared test setup: point logs and the ticket database at a throwaway
+directory before any application module reads its configuration.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="bankcust-tests-")
+
+os.environ.setdefault("LOG_DIR", os.path.join(_TMP_DIR, "logs"))
+os.environ.setdefault("SUPPORT_DB_PATH", os.path.join(_TMP_DIR, "support_tickets.db"))
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+
+class _NoTicketStore:
+    """
+    Ticket store that fails the test on any ticket access.
+    """
+
+    def create_or_attach_ticket(self, *args, **kwargs):
+        raise AssertionError("unexpected ticket created")
+
+    async def acreate_or_attach_ticket(self, *args, **kwargs):
+        raise AssertionError("unexpected ticket created")
+
+    def get_ticket_status(self, ticket_number):
+        raise AssertionError("unexpected ticket lookup")
+
+
+@pytest.fixture
+def no_ticket_store():
+    from database.store import set_ticket_store
+
+    set_ticket_store(_NoTicketStore())
+    yield
+    set_ticket_store(None)
@@ -0,0 +1,135 @@
+"""
+Tests for request coalescing (SingleFlight): shared results and errors,
+and cancellation that must not spread from one caller to the others.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.cache import SingleFlight, TTLCache
+
+
+def test_followers_share_leader_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "label"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["label"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_followers_share_leader_exception():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        raise ValueError("llm down")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.ado("k", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "label"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "label"
+    # The follower re-ran the work as the new leader
+    assert len(calls) == 2
+    assert flight.in_flight() == 0
+
+
+def test_cancelled_follower_does_not_cancel_leader():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "label"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+        quitter = asyncio.create_task(flight.ado("k", work))
+        stayer = asyncio.create_task(flight.ado("k", work))
+        await asyncio.sleep(0.01)
+
+        quitter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await quitter
+        return await leader, await stayer
+
+    assert asyncio.run(main()) == ("label", "label")
+
+
+def test_interrupted_sync_leader_releases_followers():
+    flight = SingleFlight()
+    leader_started = threading.Event()
+    release_leader = threading.Event()
+    outcomes = {}
+
+    def interrupted():
+        leader_started.set()
+        release_leader.wait()
+        raise KeyboardInterrupt
+
+    def leader():
+        try:
+            flight.do("k", interrupted)
+        except KeyboardInterrupt:
+            outcomes["leader"] = "interrupted"
+
+    def follower():
+        outcomes["follower"] = flight.do("k", lambda: "label")
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    leader_started.wait()
+
+    follower_thread = threading.Thread(target=follower)
+    follower_thread.start()
+    release_leader.set()
+
+    leader_thread.join(timeout=5)
+    follower_thread.join(timeout=5)
+    assert outcomes == {"leader": "interrupted", "follower": "label"}
+
+
+def test_ttl_cache_maxsize_zero_disables_caching():
+    cache = TTLCache(maxsize=0)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,157 @@
+"""
+Regression tests for classifier label normalization and outage fallback.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+import controller
+from agents import classifier_agent
+from agents.classifier_agent import (
+    SOURCE_FAST,
+    SOURCE_LLM,
+    UNAVAILABLE_LABEL,
+    _LABEL_SYNONYMS,
+    _normalize_label,
+    aclassify_message,
+    classify_message
+)
+from agents.fast_classifier import load_logged_labels
+
+
+def _normalize_label_reference(text: str) -> str:
+    # The original dict-order scan the precompiled pattern must match
+    for keyword, label in _LABEL_SYNONYMS.items():
+        if keyword in text:
+            return label
+    return ""
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("question about a problem", "negative_feedback"),
+    ("not a problem - positive", "positive_feedback"),
+    ("request: complaint", "negative_feedback"),
+    ("Negative Feedback", "negative_feedback"),
+    ("**query**", "query"),
+    ("an inquiry", "query"),
+    ("unsure", ""),
+    ("", ""),
+])
+def test_synonym_precedence_follows_dict_order(raw, expected):
+    assert _normalize_label(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [
+    "issue with my request",
+    "compliment, not a complaint",
+    "praise the question",
+    "problematic inquiry",
+    "requested positive issue",
+])
+def test_matches_original_scan(raw):
+    text = raw.strip().lower()
+    text = "".join(c for c in text if c.isalnum() or c == "_" or c.isspace()).replace(" ", "_")
+    assert _normalize_label(raw) == _normalize_label_reference(text)
+
+
+class _UnreachableLLM:
+    model = "down"
+
+    def invoke(self, prompt, timeout=None):
+        raise ConnectionError("upstream unreachable")
+
+    async def ainvoke(self, prompt, timeout=None):
+        raise ConnectionError("upstream unreachable")
+
+
+UNRECOGNISED = "zxqv wibble frobnicate"
+
+
+def test_outage_without_local_match_is_unavailable():
+    assert classify_message(UNRECOGNISED, _UnreachableLLM())[:2] == (UNAVAILABLE_LABEL, True)
+    assert asyncio.run(aclassify_message(UNRECOGNISED, _UnreachableLLM()))[:2] == (UNAVAILABLE_LABEL, True)
+
+
+def test_outage_asks_to_retry_instead_of_opening_ticket(no_ticket_store):
+    controller.set_llm(_UnreachableLLM())
+    try:
+        assert controller.handle_user_input(UNRECOGNISED, "ann") == controller.RETRY_REPLY
+        assert asyncio.run(
+            controller.async_handle_user_input(UNRECOGNISED, "ann")
+        ) == controller.RETRY_REPLY
+    finally:
+        controller.set_llm(None)
+
+
+def test_training_uses_only_llm_labels(tmp_path):
+    def record(message, label, source, fallback_used=False):
+        return json.dumps({
+            "agent": "ClassifierAgent", "input": message, "label": label,
+            "fallback_used": fallback_used, "source": source,
+        })
+
+    log = tmp_path / "app.log"
+    log.write_text("\n".join([
+        record("card was charged twice", "negative_feedback", "llm"),
+        record("great service", "positive_feedback", "fast"),
+        record("status of ticket 123456", "query", "prerouter"),
+        record("zxqv", "query", "llm", fallback_used=True),
+        "2026-02-04 15:30:45 | INFO | [ClassifierAgent] INPUT: hello | "
+        "OUTPUT: label=query, fallback_used=False",
+    ]) + "\n", encoding="utf-8")
+
+    assert load_logged_labels(log) == [
+        ("card was charged twice", "negative_feedback"),
+        ("hello", "query"),
+    ]
+
+
+def test_classify_message_reports_its_source():
+    assert classify_message("Thank you so much, great service!", _UnreachableLLM()) == (
+        "positive_feedback", False, SOURCE_FAST
+    )
+    assert classify_message(UNRECOGNISED, _UnreachableLLM()) == (
+        UNAVAILABLE_LABEL, True, SOURCE_LLM
+    )
+
+
+class _RecordingCache:
+    # Stands in for the SQLite tier and records which thread touched it
+    def __init__(self):
+        self.threads = []
+
+    def get(self, key, default=None):
+        self.threads.append(threading.get_ident())
+        return default
+
+    def set(self, key, value):
+        self.threads.append(threading.get_ident())
+
+
+class _QueryLLM:
+    model = "query-only"
+
+    async def ainvoke(self, prompt, timeout=None):
+        return "query"
+
+
+def test_async_classify_keeps_persistent_cache_off_the_loop(monkeypatch):
+    persistent = _RecordingCache()
+    monkeypatch.setattr(classifier_agent, "_persistent_cache", persistent)
+    classifier_agent._label_cache.clear()
+
+    async def classify():
+        label = await classifier_agent.aclassify_message_llm("when does the branch open", _QueryLLM())
+        return label, threading.get_ident()
+
+    (label, fallback_used), loop_thread = asyncio.run(classify())
+
+    assert (label, fallback_used) == ("query", False)
+    assert len(persistent.threads) == 2
+    assert loop_thread not in persistent.threads
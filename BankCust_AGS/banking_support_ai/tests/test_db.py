@@ -0,0 +1,148 @@
+"""
+Tests for the SQLite ticket store: trigger-maintained counters, their
+one-off backfill when several processes open an old database at once,
+and per-thread connection lifetime.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from database import db
+
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+_INITIALIZE_WHEN_RELEASED = """
+import os, sys, time
+from database import db
+while not os.path.exists(sys.argv[1]):
+    time.sleep(0.001)
+db.initialize_database()
+"""
+
+
+def _create_pre_counter_database(path: Path, statuses: list[str]) -> None:
+    # The original schema, from before ticket_counts and the migrations
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE support_tickets (
+            ticket_number INTEGER PRIMARY KEY AUTOINCREMENT,
+            issue_description TEXT NOT NULL,
+            status TEXT NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO support_tickets (issue_description, status) VALUES (?, ?)",
+        [(f"issue {i}", status) for i, status in enumerate(statuses)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_concurrent_startup_backfills_counts_once(tmp_path):
+    db_path = tmp_path / "old.db"
+    go = tmp_path / "go"
+    statuses = ["Open"] * 5 + ["Resolved"] * 3 + ["In Progress"] * 2
+    _create_pre_counter_database(db_path, statuses)
+
+    env = dict(os.environ, SUPPORT_DB_PATH=str(db_path))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", _INITIALIZE_WHEN_RELEASED, str(go)],
+            cwd=APP_DIR, env=env, stderr=subprocess.PIPE, text=True
+        )
+        for _ in range(8)
+    ]
+    go.touch()
+
+    errors = [p.communicate(timeout=120)[1] for p in processes]
+    assert [p.returncode for p in processes] == [0] * len(processes), errors
+
+    conn = sqlite3.connect(db_path)
+    counts = dict(conn.execute("SELECT status, total FROM ticket_counts"))
+    conn.close()
+    assert counts == {"Open": 5, "Resolved": 3, "In Progress": 2}
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    db.close_connections()
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "tickets.db")
+    db.initialize_database()
+    yield db
+    db.close_connections()
+
+
+def test_counts_follow_inserts_and_status_updates(fresh_db):
+    first = fresh_db.insert_ticket("card declined", "Open", "ann")
+    fresh_db.insert_ticket("app crashes", "Open", "bob")
+
+    assert fresh_db.count_tickets() == 2
+    assert fresh_db.count_tickets("Open") == 2
+
+    assert fresh_db.update_ticket_status(first, "Resolved")
+    assert fresh_db.count_tickets("Open") == 1
+    assert fresh_db.count_tickets("Resolved") == 1
+    assert fresh_db.get_ticket_status(first) == "Resolved"
+
+
+def test_connections_close_when_their_threads_exit(fresh_db):
+    def touch():
+        fresh_db.count_tickets()
+
+    baseline = len(fresh_db._open_connections)
+    for _ in range(50):
+        thread = threading.Thread(target=touch)
+        thread.start()
+        thread.join()
+
+    assert len(fresh_db._open_connections) <= baseline + 1
+
+
+def test_close_connections_reopens_for_existing_threads(fresh_db):
+    ticket = fresh_db.insert_ticket("card declined", "Open", "ann")
+    fresh_db.close_connections()
+
+    # This thread's cached handle was closed; it must get a new one
+    fresh_db._status_cache.clear()
+    assert fresh_db.get_ticket_status(ticket) == "Open"
+
+
+def test_dead_writer_is_restarted(fresh_db):
+    fresh_db.insert_ticket("card declined", "Open", "ann")
+
+    # Swap in a thread that has already exited, as if the writer crashed
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    fresh_db._writer._thread = dead
+
+    assert fresh_db.insert_ticket("app crashes", "Open", "bob")
+    assert fresh_db._writer.is_running()
+
+
+def test_insert_times_out_when_writer_is_stuck(fresh_db, monkeypatch):
+    release = threading.Event()
+    commit = fresh_db._TicketWriter._commit
+
+    def stuck_commit(conn, batch):
+        release.wait(timeout=5)
+        commit(conn, batch)
+
+    monkeypatch.setattr(fresh_db._TicketWriter, "_commit", staticmethod(stuck_commit))
+    monkeypatch.setattr(fresh_db, "TICKET_WRITE_TIMEOUT_S", 0.1)
+
+    try:
+        with pytest.raises(TimeoutError):
+            fresh_db.insert_ticket("card declined", "Open", "ann")
+    finally:
+        release.set()
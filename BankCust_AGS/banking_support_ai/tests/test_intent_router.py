@@ -0,0 +1,47 @@
+"""
+Regression tests for greeting routing: greetings are answered without
+classification and never open a ticket.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import pytest
+
+from agents.fast_classifier import _rule_label
+from agents.intent_router import GREETING, TICKET_STATUS, detect_intent
+
+
+GREETING_MESSAGES = ["Thanks!", "Hi!", "ok.", "Thank you!", "  Hello ", "Good morning!!"]
+
+
+@pytest.mark.parametrize("message", GREETING_MESSAGES)
+def test_punctuated_greetings_are_greetings(message):
+    assert detect_intent(message).kind == GREETING
+
+
+@pytest.mark.parametrize("message", GREETING_MESSAGES)
+def test_fast_path_agrees_with_pre_router(message):
+    # The fast path labels greetings "query"; the handler must then see
+    # the same greeting the pre-router does
+    assert _rule_label(message) == ("query", 0.99)
+    assert detect_intent(message).prerouted
+
+
+def test_hashed_ticket_number_survives_normalization():
+    intent = detect_intent("#123456")
+    assert intent.kind == TICKET_STATUS
+    assert intent.ticket_number == 123456
+
+
+@pytest.mark.parametrize("message", GREETING_MESSAGES)
+def test_greeting_creates_no_ticket(message, no_ticket_store):
+    from agents.query_handler_agent import handle_query
+
+    assert handle_query(message, "ann") == "Hello! How can I assist you today?"
+
+
+def test_thanks_through_controller_creates_no_ticket(no_ticket_store):
+    from controller import handle_user_input
+
+    assert handle_user_input("Thanks!", "ann") == "Hello! How can I assist you today?"
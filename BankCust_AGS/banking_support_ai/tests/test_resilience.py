@@ -0,0 +1,143 @@
+"""
+Tests for the LLM resilience layer: the total time budget, the
+circuit breaker and the model router's recovery of demoted models.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from controller import ModelRouter, ResilientLLM
+from utils.resilience import CircuitBreaker, RetryPolicy
+
+
+class _ReadTimeoutLLM:
+    """
+    Hangs for its read timeout (capped by the caller's), then times out.
+    """
+
+    model = "slow"
+
+    def __init__(self, read_timeout: float = 0.6):
+        self.read_timeout = read_timeout
+        self.timeouts = []
+
+    def invoke(self, prompt, timeout=None):
+        self.timeouts.append(timeout)
+        time.sleep(min(self.read_timeout, timeout or self.read_timeout))
+        raise TimeoutError("read timed out")
+
+    async def ainvoke(self, prompt, timeout=None):
+        self.timeouts.append(timeout)
+        # Ignores the cap, like a client that cannot be interrupted
+        await asyncio.sleep(self.read_timeout)
+        raise TimeoutError("read timed out")
+
+
+def _resilient(llm, budget):
+    return ResilientLLM(
+        llm,
+        retry_policy=RetryPolicy(max_attempts=5, base_delay=0.01, max_delay=0.02),
+        breaker=CircuitBreaker(),
+        total_budget=budget
+    )
+
+
+def test_invoke_stays_within_total_budget():
+    llm = _ReadTimeoutLLM(read_timeout=0.6)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        _resilient(llm, budget=1.0).invoke("hi")
+
+    assert time.monotonic() - started < 1.2
+    # Every attempt was told how much budget was left
+    assert all(t is not None and t <= 1.0 for t in llm.timeouts)
+    assert llm.timeouts == sorted(llm.timeouts, reverse=True)
+
+
+def test_ainvoke_stays_within_total_budget():
+    llm = _ReadTimeoutLLM(read_timeout=5.0)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(_resilient(llm, budget=0.5).ainvoke("hi"))
+
+    assert time.monotonic() - started < 0.8
+
+
+class _SwitchableLLM:
+    def __init__(self, model: str, delay: float):
+        self.model = model
+        self.delay = delay
+        self.failing = False
+        self.calls = 0
+
+    def invoke(self, prompt, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failing:
+            raise ConnectionError(f"{self.model} down")
+        return self.model
+
+
+def _router_client(llm):
+    return ResilientLLM(
+        llm,
+        retry_policy=RetryPolicy(max_attempts=1),
+        # Out of the way: this test is about the error-rate demotion
+        breaker=CircuitBreaker(failure_threshold=1000)
+    )
+
+
+def test_demoted_model_recovers_after_error_window():
+    fast = _SwitchableLLM("fast", delay=0.001)
+    slow = _SwitchableLLM("slow", delay=0.01)
+    router = ModelRouter(
+        [_router_client(fast), _router_client(slow)],
+        min_samples=1,
+        explore_rate=0.0,
+        error_window=0.3
+    )
+
+    assert router.invoke("hi") == "fast"
+
+    fast.failing = True
+    for _ in range(5):
+        assert router.invoke("hi") == "slow"
+    # Demoted: traffic goes to the healthy model first
+    calls_while_demoted = fast.calls
+    assert router.invoke("hi") == "slow"
+    assert fast.calls == calls_while_demoted
+
+    fast.failing = False
+    time.sleep(0.35)
+    assert router.invoke("hi") == "fast"
+
+
+def test_breaker_lets_one_trial_through_when_half_open():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_released_trial_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    # Trial cancelled without an outcome
+    breaker.release()
+    assert breaker.allow()
@@ -0,0 +1,100 @@
+"""
+Tests for worker pool admission: the bounded queue, WorkerPoolBusy and
+slot release. Turns run on threads here instead of spawned processes,
+so only the front-side bookkeeping is exercised.
+
+Run from banking_support_ai/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import worker_pool
+from worker_pool import WorkerPool, WorkerPoolBusy
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    # Every turn blocks until the test opens the gate
+    release = threading.Event()
+
+    def handle_turn(user_message, customer_name):
+        release.wait(timeout=5)
+        return f"re: {user_message}", "query"
+
+    monkeypatch.setattr(worker_pool, "_handle_turn", handle_turn)
+    yield release
+    release.set()
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(workers, max_queue, queue_timeout=0.05):
+        pool = WorkerPool(workers, max_queue=max_queue, queue_timeout=queue_timeout)
+        pool._executor.shutdown(wait=False)
+        pool._executor = ThreadPoolExecutor(max_workers=pool.workers)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_full_queue_rejects_with_worker_pool_busy(gate, make_pool):
+    pool = make_pool(workers=1, max_queue=1)
+    running = pool.submit("first")
+    queued = pool.submit("second")
+
+    assert pool.stats()["busy"] == 1
+    assert pool.stats()["queue_depth"] == 1
+    with pytest.raises(WorkerPoolBusy):
+        pool.submit("third")
+    with pytest.raises(WorkerPoolBusy):
+        asyncio.run(pool.asubmit("third"))
+
+    gate.set()
+    assert running.result(timeout=5) == ("re: first", "query")
+    assert queued.result(timeout=5) == ("re: second", "query")
+
+
+def test_slots_are_released_when_turns_finish(gate, make_pool):
+    pool = make_pool(workers=1, max_queue=0)
+    gate.set()
+
+    for n in range(5):
+        assert pool.submit(f"turn {n}").result(timeout=5)[0] == f"re: turn {n}"
+    assert asyncio.run(pool.asubmit("async turn")) == ("re: async turn", "query")
+
+    # Slots are handed back by a done-callback, just after result()
+    deadline = time.monotonic() + 5
+    while pool.stats()["busy"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["busy"] == 0
+    assert pool.stats()["queue_depth"] == 0
+
+
+def test_cancelled_waiter_does_not_take_a_slot(gate, make_pool):
+    pool = make_pool(workers=1, max_queue=0, queue_timeout=5)
+    running = pool.submit("first")
+
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(pool.asubmit("second"))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(cancel_waiter())
+
+    gate.set()
+    running.result(timeout=5)
+    # The single slot is free again for the next caller
+    assert pool.submit("third").result(timeout=5)[0] == "re: third"
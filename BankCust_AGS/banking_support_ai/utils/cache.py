@@ -0,0 +1,294 @@
+"""
+In-process caching utilities for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Bounded, thread-safe LRU cache with per-entry TTL
+- Optional SQLite-backed persistent tier that survives restarts
+- Hit / miss / eviction counters for sizing
+- Single-flight coalescing of identical in-flight computations
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+
+_MISSING = object()
+
+# Handed to SingleFlight followers when the leader was cancelled
+_RETRY = object()
+
+
+# ------------------------------------------------------------------
+# IN-MEMORY TIER
+# ------------------------------------------------------------------
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    A ttl of None (or <= 0) disables expiry; maxsize bounds memory, and
+    a maxsize of 0 disables the cache (every get misses).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600.0):
+        self.maxsize = max(int(maxsize), 0)
+        self.ttl = ttl if ttl and ttl > 0 else None
+
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        if not self.maxsize:
+            return
+
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# ------------------------------------------------------------------
+# PERSISTENT TIER
+# ------------------------------------------------------------------
+
+class SQLiteCache:
+    """
+    Small key/value store in its own SQLite file with wall-clock expiry.
+
+    Values must be strings; callers serialize anything richer.
+    """
+
+    def __init__(self, path, ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl if ttl and ttl > 0 else None
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL
+            )
+        """)
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),)
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= time.time()):
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries"
+            ).fetchone()[0]
+            return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+# ------------------------------------------------------------------
+# REQUEST COALESCING
+# ------------------------------------------------------------------
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive while it is in flight wait for and share its result or
+    exception. Entries are dropped as soon as the leader finishes, so
+    this never serves stale values - pair it with a cache for that.
+
+    Only ordinary exceptions are shared. If the leader itself is
+    cancelled or interrupted, its waiting followers are released to try
+    again (one of them becomes the new leader) instead of inheriting
+    the leader's cancellation.
+
+    Both entry points share one in-flight table keyed by a
+    concurrent.futures.Future, so threads and event loops (in any
+    thread) coalesce with each other.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func: Callable[[], Any]):
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                result = future.result()
+                if result is _RETRY:
+                    continue
+                return result
+
+            try:
+                result = func()
+            except Exception as exc:
+                self._finish(key, future, error=exc)
+                raise
+            except BaseException:
+                self._finish(key, future, _RETRY)
+                raise
+
+            self._finish(key, future, result)
+            return result
+
+    async def ado(self, key, func: Callable[[], Awaitable[Any]]):
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                # Shielded so a cancelled follower does not cancel the
+                # shared future under the leader and the other followers
+                result = await asyncio.shield(asyncio.wrap_future(future))
+                if result is _RETRY:
+                    continue
+                return result
+
+            try:
+                result = await func()
+            except Exception as exc:
+                self._finish(key, future, error=exc)
+                raise
+            except BaseException:
+                self._finish(key, future, _RETRY)
+                raise
+
+            self._finish(key, future, result)
+            return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.leaders + self.shared
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "shared_rate": self.shared / calls if calls else 0.0,
+            }
@@ -0,0 +1,110 @@
+"""
+Near-duplicate detection helpers for support tickets.
+
+Responsibilities:
+- MinHash signatures over word unigrams + bigrams of a message
+- LSH band buckets (scoped per customer) for indexed candidate lookup
+- Jaccard similarity estimates between two signatures
+- Compact binary packing of signatures for storage
+
+Pure functions only; storage and lookup live in the ticket stores
+(database/db.py, database/postgres_store.py).
+"""
+
+import hashlib
+import os
+import random
+from array import array
+from typing import Optional
+
+from utils.text import tokenize
+
+
+# ------------------------------------------------------------------
+# CONFIGURATION
+# ------------------------------------------------------------------
+
+# 32 permutations in 8 bands of 4 rows: pairs with Jaccard ≳ 0.6 share
+# at least one bucket with high probability, unrelated text almost never.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity above which two messages are duplicates
+SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+
+_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures must be stable across processes and restarts
+_rng = random.Random(20240611)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+# ------------------------------------------------------------------
+# SIGNATURES
+# ------------------------------------------------------------------
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(),
+        "little"
+    )
+
+
+def shingles(message: str) -> set[str]:
+    tokens = tokenize(message)
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def minhash(message: str) -> Optional[tuple[int, ...]]:
+    """
+    Returns the MinHash signature of a message, or None when it has no
+    word tokens to compare.
+    """
+
+    hashes = [_hash64(shingle) for shingle in shingles(message)]
+    if not hashes:
+        return None
+
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def lsh_buckets(signature: tuple[int, ...], scope: str = "") -> list[int]:
+    """
+    One signed 64-bit bucket id per band. `scope` (e.g. the customer
+    name) is mixed in so candidates never cross scopes.
+    """
+
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            f"{scope}|{band}|{','.join(map(str, rows))}".encode("utf-8"),
+            digest_size=8
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """
+    Estimated Jaccard similarity of the two underlying shingle sets.
+    """
+
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def pack(signature: tuple[int, ...]) -> bytes:
+    return array("Q", signature).tobytes()
+
+
+def unpack(blob: bytes) -> tuple[int, ...]:
+    values = array("Q")
+    values.frombytes(blob)
+    return tuple(values)
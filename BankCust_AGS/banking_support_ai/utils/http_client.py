@@ -0,0 +1,220 @@
+"""
+Shared HTTP client registry for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Hold one pooled requests.Session per named client (process-wide)
+- Hold one pooled httpx.AsyncClient per named client and event loop
+- Configure connection pool size, per-host limits and TCP keep-alive
+- Allow callers (and tests) to reset the pool after reconfiguring it
+
+Reusing a session keeps connections to the LLM endpoint alive between
+chat turns, so only the first request pays the TCP + TLS handshake.
+
+requests and httpx are imported when the first client is built, not
+when this module is imported, to keep process start-up light.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+
+# ------------------------------------------------------------------
+# POOL CONFIGURATION (ENV-OVERRIDABLE)
+# ------------------------------------------------------------------
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+_pool_config = {
+    # Number of distinct host pools kept in the adapter
+    "pool_connections": _env_int("HTTP_POOL_CONNECTIONS", 4),
+    # Maximum open connections kept per host
+    "pool_maxsize": _env_int("HTTP_POOL_MAXSIZE", 32),
+    # Block (instead of opening throwaway connections) when a host is saturated
+    "pool_block": os.getenv("HTTP_POOL_BLOCK", "false").lower() == "true",
+    # Idle seconds before TCP keep-alive probes start (0 disables)
+    "keepalive_idle": _env_int("HTTP_KEEPALIVE_IDLE", 60),
+}
+
+_sessions: dict[str, "requests.Session"] = {}
+# Keyed weakly by event loop: a loop's clients are dropped with it, and a
+# new loop never inherits clients bound to a dead one
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+# ------------------------------------------------------------------
+# ADAPTER
+# ------------------------------------------------------------------
+
+def _keepalive_socket_options(idle: int) -> list:
+    from urllib3.connection import HTTPConnection
+
+    options = list(HTTPConnection.default_socket_options)
+    if idle <= 0:
+        return options
+
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Linux-only knobs; other platforms fall back to OS defaults
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(idle // 4, 1)))
+    return options
+
+
+_adapter_class = None
+
+
+def _keepalive_adapter_class():
+    """
+    Defines (once) an HTTPAdapter that enables TCP keep-alive on pooled
+    sockets. Built on first use so requests is not imported eagerly.
+    """
+
+    global _adapter_class
+
+    if _adapter_class is None:
+        from requests.adapters import HTTPAdapter
+
+        class KeepAliveAdapter(HTTPAdapter):
+
+            def __init__(self, keepalive_idle: int = 60, **kwargs):
+                self._socket_options = _keepalive_socket_options(keepalive_idle)
+                super().__init__(**kwargs)
+
+            def init_poolmanager(self, *args, **kwargs):
+                kwargs["socket_options"] = self._socket_options
+                super().init_poolmanager(*args, **kwargs)
+
+        _adapter_class = KeepAliveAdapter
+
+    return _adapter_class
+
+
+def _build_session() -> "requests.Session":
+    import requests
+
+    session = requests.Session()
+    adapter = _keepalive_adapter_class()(
+        keepalive_idle=_pool_config["keepalive_idle"],
+        pool_connections=_pool_config["pool_connections"],
+        pool_maxsize=_pool_config["pool_maxsize"],
+        pool_block=_pool_config["pool_block"],
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# ------------------------------------------------------------------
+# PUBLIC REGISTRY API
+# ------------------------------------------------------------------
+
+def get_session(name: str = "default") -> "requests.Session":
+    """
+    Returns the process-wide pooled session registered under `name`,
+    creating it on first use.
+    """
+
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = _build_session()
+            _sessions[name] = session
+        return session
+
+
+def get_async_client(name: str = "default") -> "httpx.AsyncClient":
+    """
+    Returns the pooled async client registered under `name` for the
+    running event loop, creating it on first use.
+
+    Must be called from inside a coroutine. httpx connection pools are
+    bound to the loop that opened them, hence one client per loop; call
+    aclose_all() before the loop stops to close them cleanly.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    clients = _async_clients.get(loop)
+    if clients is None:
+        with _lock:
+            clients = _async_clients.setdefault(loop, {})
+
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=_pool_config["pool_maxsize"] * _pool_config["pool_connections"],
+            max_keepalive_connections=_pool_config["pool_maxsize"],
+            keepalive_expiry=max(_pool_config["keepalive_idle"], 5),
+        )
+        client = httpx.AsyncClient(limits=limits)
+        clients[name] = client
+    return client
+
+
+def configure_pool(**overrides) -> None:
+    """
+    Updates pool settings and drops existing sessions so the next
+    get_session() call picks up the new configuration.
+
+    Accepted keys: pool_connections, pool_maxsize, pool_block,
+    keepalive_idle.
+    """
+
+    unknown = set(overrides) - set(_pool_config)
+    if unknown:
+        raise ValueError(f"Unknown pool settings: {sorted(unknown)}")
+
+    with _lock:
+        _pool_config.update(overrides)
+    close_all()
+
+
+def close_all() -> None:
+    """
+    Closes every registered sync session and clears the registry.
+    Async clients are dropped; use aclose_all() to close them cleanly.
+    """
+
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _async_clients.clear()
+
+    for session in sessions:
+        session.close()
+
+
+async def aclose_all() -> None:
+    """
+    Closes the async clients owned by the running event loop.
+    """
+
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+
+    for client in clients.values():
+        await client.aclose()
@@ -4,22 +4,87 @@ Multi-Agent System.
 
 Logs are written to both:
 - Console (stdout) for local development
-- File (logs/app.log) for persistence and debugging
+- File (logs/app.log) for persistence and debugging, one JSON object
+  per line, rotated by size (or by time when LOG_ROTATE_WHEN is set)
+
+Request threads only enqueue log records. Formatting and all I/O happen
+on a background QueueListener thread, so a slow disk or console never
+delays a customer's reply.
+
+Importing this module has no side effects: the log directory, handlers
+and listener are created by configure_logging() (called from
+bootstrap(), or lazily by the first log_event()).
+
+Worker processes (see worker_pool.py) call configure_worker_logging()
+instead and send their records to the front process, which remains the
+only writer of app.log, so rotation never races between processes.
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
 
 
 # ------------------------------------------------------------------
 # LOG DIRECTORY SETUP
 # ------------------------------------------------------------------
 
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+# Anchored to the project directory (BankCust_AGS/logs, where the log has
+# always lived), not the process CWD
+LOG_DIR = Path(os.getenv("LOG_DIR", Path(__file__).resolve().parents[2] / "logs"))
+
+LOG_FILE_PATH = LOG_DIR / "app.log"
+
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# e.g. "midnight" or "H"; when set, rotation is time-based instead of size-based
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN")
+
+
+# ------------------------------------------------------------------
+# FORMATTERS
+# ------------------------------------------------------------------
+
+class JsonFormatter(logging.Formatter):
+    """
+    Renders a record as one JSON object. Structured fields passed to
+    log_event() are emitted as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc)
+                          .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+
+        event = getattr(record, "event", None)
+        if event is not None:
+            payload.update(event)
+        else:
+            payload["message"] = record.getMessage()
 
-LOG_FILE_PATH = os.path.join(LOG_DIR, "app.log")
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that skips the default prepare() step, which would
+    format the message on the calling thread. Records stay in-process,
+    so the listener can format them lazily.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 # ------------------------------------------------------------------
@@ -28,40 +93,144 @@ LOG_FILE_PATH = os.path.join(LOG_DIR, "app.log")
 
 logger = logging.getLogger("BankCustAgentLogger")
 logger.setLevel(logging.INFO)
+logger.propagate = False
+
+_listener = None
+_configured = False
+_configure_lock = threading.Lock()
+
 
-# Prevent duplicate handlers on Streamlit reruns
-if not logger.handlers:
+def configure_logging() -> None:
+    """
+    Creates the log directory, handlers and listener thread.
+    Idempotent and thread-safe.
+    """
 
-    # File handler
-    file_handler = logging.FileHandler(LOG_FILE_PATH)
-    file_handler.setLevel(logging.INFO)
+    global _listener, _configured
+
+    if _configured:
+        return
+
+    with _configure_lock:
+        # Prevent duplicate handlers on Streamlit reruns
+        if _configured or logger.handlers:
+            _configured = True
+            return
+
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+        # File handler (JSON lines, rotated)
+        if LOG_ROTATE_WHEN:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                LOG_FILE_PATH,
+                when=LOG_ROTATE_WHEN,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE_PATH,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+        file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(JsonFormatter())
+
+        # Console handler (human-readable)
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(logging.Formatter(
+            "%(asctime)s | %(levelname)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        ))
+
+        # Hot path only enqueues; the listener thread formats and writes
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(
+            log_queue,
+            file_handler,
+            console_handler,
+            respect_handler_level=True
+        )
+        _listener.start()
+
+        # Flush anything still queued when the interpreter exits
+        atexit.register(_listener.stop)
+
+        _configured = True
 
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
 
-    # Log format
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+# ------------------------------------------------------------------
+# MULTI-PROCESS FORWARDING
+# ------------------------------------------------------------------
+
+class _ForwardHandler(logging.Handler):
+    """
+    Hands records received from worker processes to this process's
+    logger, honouring its current level.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def configure_worker_logging(log_queue) -> None:
+    """
+    Sends this process's log records to `log_queue` (a multiprocessing
+    queue drained by forward_worker_logs() in the front process) instead
+    of writing files itself.
+    """
+
+    global _configured
 
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    with _configure_lock:
+        logger.handlers.clear()
+        # The standard prepare() renders the message and drops args, so
+        # records pickle cleanly; the structured `event` dict travels as is
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _configured = True
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+
+def forward_worker_logs(log_queue) -> logging.handlers.QueueListener:
+    """
+    Starts a listener thread that writes worker records through this
+    process's handlers. Stop it after the workers have exited.
+    """
+
+    configure_logging()
+    listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    return listener
 
 
 # ------------------------------------------------------------------
 # PUBLIC LOGGING FUNCTION
 # ------------------------------------------------------------------
 
-def log_event(agent: str, input_text: str, output_text: str):
+def log_event(agent: str, input_text: str, output_text: str, **fields):
     """
     Logs an agent interaction in a structured format.
+
+    Extra keyword fields (label, ticket_number, latency_ms, ...) are
+    stored as structured keys in the JSON log. The human-readable
+    message is only rendered if a handler actually formats it.
     """
 
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    if not _configured:
+        configure_logging()
+
+    event = {"agent": agent, "input": input_text, "output": output_text}
+    event.update(fields)
+
     logger.info(
-        f"[{agent}] INPUT: {input_text} | OUTPUT: {output_text}"
+        "[%s] INPUT: %s | OUTPUT: %s",
+        agent, input_text, output_text,
+        extra={"event": event}
     )
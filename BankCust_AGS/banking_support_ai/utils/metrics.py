@@ -0,0 +1,304 @@
+"""
+In-process metrics for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Timing spans around pipeline stages (classifier, LLM, DB, UI)
+- Latency summaries with p50 / p95 / p99 over a sliding window
+- Counters (fallbacks, tickets created, LLM errors, token usage)
+- Prometheus text exposition, served on a small side-car HTTP server
+- Readiness probe (/ready) on the same server
+
+Everything is stdlib-only and thread-safe; recording a sample costs a
+lock acquisition and a deque append.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+
+PREFIX = "bankcust"
+
+# Number of most recent samples kept per latency series for quantiles
+WINDOW_SIZE = 2048
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# ------------------------------------------------------------------
+# METRIC TYPES
+# ------------------------------------------------------------------
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: Optional[dict] = None) -> str:
+    items = list(key) + sorted((extra or {}).items())
+    if not items:
+        return ""
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in items)
+    return "{" + rendered + "}"
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    def __init__(self, name: str, help_text: str):
+        self.name = f"{PREFIX}_{name}"
+        self.help_text = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+
+class LatencySummary:
+    """
+    Latency series per label set: running count/sum plus a sliding
+    window of recent samples for quantiles.
+    """
+
+    def __init__(self, name: str, help_text: str):
+        self.name = f"{PREFIX}_{name}"
+        self.help_text = help_text
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0, 0.0, deque(maxlen=WINDOW_SIZE)]
+                self._series[key] = series
+            series[0] += 1
+            series[1] += seconds
+            series[2].append(seconds)
+
+    def quantiles(self, **labels) -> dict[float, float]:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            samples = sorted(series[2]) if series else []
+        return {q: _quantile(samples, q) for q in QUANTILES}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} summary"]
+        with self._lock:
+            snapshot = [
+                (key, count, total, sorted(window))
+                for key, (count, total, window) in sorted(self._series.items())
+            ]
+
+        for key, count, total, samples in snapshot:
+            for q in QUANTILES:
+                value = _quantile(samples, q)
+                lines.append(
+                    f"{self.name}{_format_labels(key, {'quantile': q})} {value:.6f}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def _quantile(samples: list[float], q: float) -> float:
+    if not samples:
+        return math.nan
+    index = min(int(math.ceil(q * len(samples))) - 1, len(samples) - 1)
+    return samples[max(index, 0)]
+
+
+# ------------------------------------------------------------------
+# REGISTRY
+# ------------------------------------------------------------------
+
+STAGE_LATENCY = LatencySummary(
+    "stage_latency_seconds",
+    "Latency of each pipeline stage in seconds."
+)
+CLASSIFICATIONS = Counter(
+    "classifications_total",
+    "Classifier decisions by label and whether the fallback was applied."
+)
+TICKETS_CREATED = Counter(
+    "tickets_created_total",
+    "Support tickets created, by creating agent."
+)
+TICKETS_ATTACHED = Counter(
+    "tickets_attached_total",
+    "Near-duplicate messages attached to an open ticket, by agent."
+)
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "LLM completion requests by model and outcome."
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the LLM provider, by model and token type."
+)
+LLM_RESILIENCE = Counter(
+    "llm_resilience_events_total",
+    "Retries, hedged requests and circuit-breaker rejections."
+)
+WORKER_TURNS = Counter(
+    "worker_turns_total",
+    "Turns dispatched to the worker pool, by outcome (ok, error, rejected)."
+)
+
+_metrics: list = [
+    STAGE_LATENCY,
+    CLASSIFICATIONS,
+    TICKETS_CREATED,
+    TICKETS_ATTACHED,
+    LLM_REQUESTS,
+    LLM_TOKENS,
+    LLM_RESILIENCE,
+    WORKER_TURNS,
+]
+_gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+_readiness_check: Optional[Callable[[], bool]] = None
+
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]) -> None:
+    """
+    Registers a gauge whose value is read lazily at scrape time.
+    """
+
+    _gauges[f"{PREFIX}_{name}"] = (help_text, read)
+
+
+def set_readiness_check(check: Callable[[], bool]) -> None:
+    """
+    Registers the callable behind /ready (200 when it returns True,
+    503 otherwise).
+    """
+
+    global _readiness_check
+    _readiness_check = check
+
+
+def reset_metrics() -> None:
+    """
+    Clears all recorded samples (used between benchmark phases).
+    """
+
+    for metric in _metrics:
+        metric.reset()
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Records the wall time of the enclosed block under `stage`.
+    Works around `await` expressions as well.
+    """
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, stage=stage)
+
+
+def render_prometheus() -> str:
+    """
+    Returns all metrics in the Prometheus text exposition format.
+    """
+
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+
+    for name, (help_text, read) in sorted(_gauges.items()):
+        try:
+            value = float(read())
+        except Exception:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value:g}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------------
+# HTTP ENDPOINT
+# ------------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+
+        if path == "/metrics":
+            self._send(200, render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/ready":
+            try:
+                ready = _readiness_check is None or bool(_readiness_check())
+            except Exception:
+                ready = False
+            self._send(200 if ready else 503, "ready\n" if ready else "starting\n")
+        else:
+            self.send_error(404)
+
+    def _send(self, status: int, text: str, content_type: str = "text/plain; charset=utf-8"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # Scrapes are frequent; keep them out of the app log
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves /metrics and /ready on a daemon thread next to the Gradio app.
+    """
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever,
+        name="metrics-server",
+        daemon=True
+    ).start()
+    return server
@@ -31,3 +31,28 @@ IMPORTANT:
 User message:
 \"\"\"{message}\"\"\"
 """
+
+
+BATCH_CLASSIFIER_PROMPT = """
+You are a banking customer support classifier.
+
+Classify EACH numbered user message below into exactly ONE of the
+following categories:
+
+- positive_feedback
+- negative_feedback
+- query
+
+Classification rules:
+- Positive feedback expresses gratitude, appreciation, or satisfaction.
+- Negative feedback expresses complaints, dissatisfaction, or unresolved issues.
+- A query asks for information, clarification, or ticket status updates.
+
+IMPORTANT:
+- Return ONLY a JSON array of {count} category labels, in message order.
+- Example for three messages: ["query", "negative_feedback", "query"]
+- Do NOT include explanations, numbering, or extra text.
+
+User messages:
+{messages}
+"""
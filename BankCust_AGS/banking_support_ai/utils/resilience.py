@@ -0,0 +1,249 @@
+"""
+Resilience primitives for calls to remote services (LLM provider).
+
+Responsibilities:
+- Decide which failures are worth retrying (timeouts, 429, 5xx)
+- Jittered exponential backoff that honours Retry-After
+- Rolling latency tracking (p95 used as a hedging deadline)
+- Circuit breaker that fails fast while the upstream is unhealthy
+"""
+
+import email.utils
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling the upstream while the breaker is open.
+    """
+
+
+# ------------------------------------------------------------------
+# FAILURE CLASSIFICATION
+# ------------------------------------------------------------------
+
+def _response_of(exc: BaseException):
+    # requests.HTTPError and httpx.HTTPStatusError both carry .response
+    return getattr(exc, "response", None)
+
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    response = _response_of(exc)
+    return getattr(response, "status_code", None) if response is not None else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    True for transient failures: throttling, server errors, timeouts and
+    connection problems. Client errors (400, 401, ...) are not retried.
+    """
+
+    if isinstance(exc, CircuitOpenError):
+        return False
+
+    status = status_code_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+
+    # Timeouts / connection resets from requests, httpx or the stdlib
+    name = type(exc).__name__.lower()
+    return any(word in name for word in ("timeout", "connect", "network", "remoteprotocol"))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Parses a Retry-After header (delta-seconds or HTTP date), if any.
+    """
+
+    response = _response_of(exc)
+    headers = getattr(response, "headers", None) if response is not None else None
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+# ------------------------------------------------------------------
+# RETRY POLICY
+# ------------------------------------------------------------------
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    A server-supplied Retry-After wins over the computed delay; if it is
+    longer than `max_delay` the call is not retried at all, so a
+    throttled provider never stalls a customer for longer than that.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        rng: Optional[random.Random] = None
+    ):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def next_delay(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """
+        Returns the sleep before attempt `attempt + 1`, or None to give up.
+        `attempt` counts from 1.
+        """
+
+        if attempt >= self.max_attempts or not is_retryable(exc):
+            return None
+
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, ceiling)
+
+
+# ------------------------------------------------------------------
+# LATENCY TRACKING
+# ------------------------------------------------------------------
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies and outcomes.
+    """
+
+    def __init__(self, window: int = 200):
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            if ok:
+                self._latencies.append(seconds)
+            self._outcomes.append((time.monotonic(), ok))
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(int(math.ceil(q * len(samples))) - 1, len(samples) - 1)
+        return samples[max(index, 0)]
+
+    def error_rate(self, max_age: Optional[float] = None) -> float:
+        """
+        Share of failed calls in the window; with `max_age`, only calls
+        from the last `max_age` seconds count, so old errors age out.
+        """
+
+        cutoff = time.monotonic() - max_age if max_age is not None else None
+        with self._lock:
+            outcomes = [
+                ok for at, ok in self._outcomes
+                if cutoff is None or at >= cutoff
+            ]
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+
+# ------------------------------------------------------------------
+# CIRCUIT BREAKER
+# ------------------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds; then a single trial call
+    is let through and its outcome closes or re-opens the circuit. A
+    trial that ends without an outcome (cancelled, abandoned stream) is
+    handed back with release(); one that never reports at all expires
+    after another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN:
+                now = time.monotonic()
+                if not self._trial_in_flight or now - self._trial_started >= self.reset_timeout:
+                    self._trial_in_flight = True
+                    self._trial_started = now
+                    return True
+            return False
+
+    def release(self) -> None:
+        """
+        Gives back a half-open trial that finished without a success or
+        failure to record, so the next call can probe the upstream.
+        """
+
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
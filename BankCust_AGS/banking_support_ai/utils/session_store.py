@@ -0,0 +1,212 @@
+"""
+Server-side conversation sessions for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Bounded per-session memory: recent turns, ticket numbers, labels
+- Compact serialization (minified JSON, zlib above a size threshold)
+- Pluggable stores keyed by session id:
+  - MemorySessionStore: in-process LRU with TTL
+  - SQLiteSessionStore: shared file, so replicas need no sticky sessions
+- Store selection from the environment (SESSION_STORE)
+
+Sessions are read at the start of a turn and written at its end; two
+turns racing in the same session resolve last-writer-wins.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from utils.cache import TTLCache
+
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "86400"))
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "20"))
+SESSION_MAX_TICKETS = 20
+SESSION_MAX_LABELS = 50
+
+# Payloads above this size are zlib-compressed before storage
+_COMPRESS_MIN_BYTES = 512
+
+
+# ------------------------------------------------------------------
+# SESSION MODEL
+# ------------------------------------------------------------------
+
+def new_session() -> dict:
+    return {
+        "last_ticket_number": None,
+        "turns": [],
+        "tickets": [],
+        "labels": {},
+    }
+
+
+def record_turn(session: dict, message: str, response: str, label: Optional[str]) -> None:
+    """
+    Appends a turn and trims every collection to its bound.
+    """
+
+    session["turns"].append([message, response, label])
+    del session["turns"][:-SESSION_MAX_TURNS]
+
+    if label:
+        labels = session["labels"]
+        labels.pop(message, None)
+        labels[message] = label
+        for stale in list(labels)[:-SESSION_MAX_LABELS]:
+            del labels[stale]
+
+
+def record_ticket(session: dict, ticket_number: int) -> None:
+    session["last_ticket_number"] = ticket_number
+    tickets = session["tickets"]
+    if ticket_number in tickets:
+        tickets.remove(ticket_number)
+    tickets.append(ticket_number)
+    del tickets[:-SESSION_MAX_TICKETS]
+
+
+def dumps(session: dict) -> bytes:
+    data = json.dumps(session, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+
+def loads(blob: bytes) -> dict:
+    kind, data = blob[:1], blob[1:]
+    if kind == b"z":
+        data = zlib.decompress(data)
+    session = new_session()
+    session.update(json.loads(data))
+    return session
+
+
+# ------------------------------------------------------------------
+# STORES
+# ------------------------------------------------------------------
+
+class MemorySessionStore:
+    """
+    Sessions held in this process only (LRU-bounded, idle TTL).
+    Stored serialized, so callers never share mutable state.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = SESSION_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        blob = self._cache.get(session_id)
+        return loads(blob) if blob is not None else None
+
+    def put(self, session_id: str, session: dict) -> None:
+        self._cache.set(session_id, dumps(session))
+
+    def delete(self, session_id: str) -> None:
+        self._cache.pop(session_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file that every replica on the host (or a
+    shared volume) can open. Writing a session extends its TTL.
+    """
+
+    def __init__(self, path, ttl: float = SESSION_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)
+        )
+        self._conn.commit()
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def put(self, session_id: str, session: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) "
+                "VALUES (?, ?, ?)",
+                (session_id, dumps(session), time.time() + self.ttl)
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"size": size}
+
+
+# ------------------------------------------------------------------
+# SHARED STORE
+# ------------------------------------------------------------------
+
+_DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "database" / "sessions.db"
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Returns the process-wide store: SESSION_STORE=sqlite selects the
+    file-backed store at SESSION_DB_PATH, anything else the in-memory one.
+    """
+
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if os.getenv("SESSION_STORE", "memory").lower() == "sqlite":
+                    _store = SQLiteSessionStore(
+                        os.getenv("SESSION_DB_PATH", _DEFAULT_DB_PATH)
+                    )
+                else:
+                    _store = MemorySessionStore(
+                        maxsize=int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+                    )
+    return _store
+
+
+def set_session_store(store) -> None:
+    global _store
+    _store = store
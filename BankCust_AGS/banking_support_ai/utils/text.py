@@ -0,0 +1,27 @@
+"""
+Text normalization helpers shared by the classifier tiers.
+"""
+
+import re
+import string
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Canonical form of a user message: lowercase, collapsed whitespace,
+    no leading/trailing punctuation.
+    """
+
+    text = " ".join(message.lower().split())
+    return text.strip(string.punctuation + " ")
+
+
+def tokenize(message: str) -> list[str]:
+    """
+    Lowercase word tokens (apostrophes kept, so "hasn't" stays whole).
+    """
+
+    return _TOKEN_PATTERN.findall(message.lower())
@@ -0,0 +1,271 @@
+"""
+Multi-process serving mode for the Banking Customer Support
+Multi-Agent System.
+
+Responsibilities:
+- Run controller turns (handle_user_input) in a pool of worker
+  processes, so the CPU-bound parts of a turn (normalization,
+  classification, log formatting, SQLite writes) use every core
+  instead of sharing one GIL
+- Give each worker its own LLM client, DB connections and caches:
+  bootstrap() runs in every worker at start-up. The ticket status cache
+  is turned off in workers: admin status updates happen in the front
+  process and could not invalidate a worker's copy
+- Bound the turns admitted at once (running + queued); when the queue
+  is full a caller waits up to WORKER_QUEUE_TIMEOUT, then gets
+  WorkerPoolBusy instead of piling up unbounded work
+- Report queue depth, busy workers and pool size as gauges
+- Forward worker log records to the front process, which stays the
+  only writer of logs/app.log
+
+The front process (app.py) keeps the UI, sessions and the admin view.
+Enabled with APP_WORKERS=N; 0 (the default) keeps turns in-process.
+Worker-side metrics (stage latencies, LLM calls) stay in the workers;
+the front reports only dispatch-level numbers.
+
+Usage (from banking_support_ai/):
+    APP_WORKERS=16 python app.py
+    python -m benchmarks.run_benchmark --mode processes --workers 16
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from utils.logger import configure_worker_logging, forward_worker_logs
+from utils.metrics import STAGE_LATENCY, WORKER_TURNS, register_gauge
+
+
+WORKERS = int(os.getenv("APP_WORKERS", "0"))
+
+# Turns allowed to wait for a free worker, on top of one running per worker
+WORKER_QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", str(max(WORKERS, 1) * 4)))
+
+# How long a caller waits for a queue slot before WorkerPoolBusy
+WORKER_QUEUE_TIMEOUT = float(os.getenv("WORKER_QUEUE_TIMEOUT", "10"))
+
+_ADMISSION_POLL_S = 0.005
+
+
+class WorkerPoolBusy(RuntimeError):
+    """
+    Raised when no queue slot frees up within the timeout.
+    """
+
+
+# ------------------------------------------------------------------
+# WORKER SIDE
+# ------------------------------------------------------------------
+
+def _initialize_worker(log_queue) -> None:
+    configure_worker_logging(log_queue)
+
+    # Ctrl-C is handled by the front process, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from bootstrap import bootstrap
+    from database.store import get_ticket_store
+
+    bootstrap()
+    get_ticket_store().disable_status_cache()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _handle_turn(user_message: str, customer_name: str) -> tuple[str, str]:
+    """
+    Runs one turn in a worker; returns (response, label).
+    """
+
+    from controller import handle_user_input_stream
+
+    for response, _, label in handle_user_input_stream(user_message, customer_name):
+        pass
+    return response, label
+
+
+# ------------------------------------------------------------------
+# FRONT SIDE
+# ------------------------------------------------------------------
+
+class WorkerPool:
+    """
+    Dispatches turns to `workers` processes through a bounded queue.
+
+    Admission is a semaphore with workers + max_queue slots: a turn holds
+    a slot from submit until its result arrives, so at most `max_queue`
+    turns are ever waiting inside the executor.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int = WORKER_QUEUE_SIZE,
+        queue_timeout: float = WORKER_QUEUE_TIMEOUT
+    ):
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        # spawn, not fork: the front process has live threads (log
+        # listener, DB writer, HTTP pools) that must not be copied
+        context = multiprocessing.get_context("spawn")
+        self._log_queue = context.Queue()
+        self._log_listener = forward_worker_logs(self._log_queue)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(self._log_queue,)
+        )
+
+    def start(self) -> None:
+        """
+        Starts every worker and waits until each has bootstrapped, so
+        the first customers do not pay for worker start-up.
+        """
+
+        pings = [self._executor.submit(_ping) for _ in range(self.workers)]
+        for ping in pings:
+            ping.result()
+
+    def queue_depth(self) -> int:
+        """
+        Turns admitted but still waiting for a free worker.
+        """
+
+        return max(self._pending - self.workers, 0)
+
+    def busy_workers(self) -> int:
+        return min(self._pending, self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "busy": self.busy_workers(),
+            "queue_depth": self.queue_depth(),
+        }
+
+    def submit(self, user_message: str, customer_name: str = "Customer") -> Future:
+        """
+        Queues one turn; the Future resolves to (response, label).
+        Blocks while the queue is full, up to queue_timeout.
+        """
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            WORKER_TURNS.inc(outcome="rejected")
+            raise WorkerPoolBusy("All workers busy and the queue is full")
+        return self._dispatch(user_message, customer_name)
+
+    async def asubmit(self, user_message: str, customer_name: str = "Customer") -> tuple[str, str]:
+        """
+        Awaitable submit(); waits for a queue slot off the event loop.
+        """
+
+        # Polls rather than blocking a thread, so a cancelled caller can
+        # never acquire a slot after it has gone away
+        deadline = time.monotonic() + self.queue_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                WORKER_TURNS.inc(outcome="rejected")
+                raise WorkerPoolBusy("All workers busy and the queue is full")
+            await asyncio.sleep(_ADMISSION_POLL_S)
+        return await asyncio.wrap_future(self._dispatch(user_message, customer_name))
+
+    def _dispatch(self, user_message: str, customer_name: str) -> Future:
+        with self._pending_lock:
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        try:
+            future = self._executor.submit(_handle_turn, user_message, customer_name)
+        except BaseException:
+            self._release()
+            raise
+
+        def done(future: Future) -> None:
+            self._release()
+            STAGE_LATENCY.observe(time.perf_counter() - submitted, stage="worker_turn")
+            failed = future.cancelled() or future.exception() is not None
+            WORKER_TURNS.inc(outcome="error" if failed else "ok")
+
+        future.add_done_callback(done)
+        return future
+
+    def _release(self) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._log_listener.stop()
+
+
+# ------------------------------------------------------------------
+# SHARED POOL
+# ------------------------------------------------------------------
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """
+    Returns the process-wide pool, created on first use, or None when
+    APP_WORKERS is 0 (turns then run in the calling process).
+    """
+
+    global _pool
+
+    if _pool is None and WORKERS > 0:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(WORKERS)
+    return _pool
+
+
+def shutdown_worker_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def _pool_stat(key: str) -> float:
+    # The exporter skips gauges that raise, so these stay absent until
+    # the pool exists
+    if _pool is None:
+        raise LookupError("worker pool not started")
+    return _pool.stats()[key]
+
+
+register_gauge(
+    "worker_queue_depth",
+    "Turns waiting for a free worker process.",
+    lambda: _pool_stat("queue_depth")
+)
+register_gauge(
+    "worker_busy",
+    "Worker processes currently running a turn.",
+    lambda: _pool_stat("busy")
+)
+register_gauge(
+    "worker_pool_size",
+    "Worker processes in the pool.",
+    lambda: _pool_stat("workers")
+)